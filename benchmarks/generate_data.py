@@ -0,0 +1,116 @@
+# benchmarks/generate_data.py
+"""Generate a synthetic EduQuizPortal database for benchmarking.
+
+Writes straight to an SQLite file with the same schema as the sqlite
+backend, so the services and DAOs can be benchmarked against it:
+
+    python benchmarks/generate_data.py --out data/bench.db
+    python benchmarks/generate_data.py --out data/bench_small.db --students 1000 --attempts 50000
+
+Student ``s<N>`` has the password ``pass<N>``; the runner logs in with these.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), 'src'))
+
+from dao.sqlite_client import SCHEMA
+
+OPTIONS = "ABCD"
+BATCH = 50000
+
+
+def _batches(rows, size=BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(conn, sql, rows):
+    total = 0
+    for batch in _batches(rows):
+        conn.executemany(sql, batch)
+        total += len(batch)
+    conn.commit()
+    return total
+
+
+def generate(path, students, subjects, questions, attempts, seed=42):
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript(SCHEMA)
+    started = time.perf_counter()
+
+    _insert(conn, "INSERT INTO users (user_id, username, email, password, role) VALUES (?, ?, ?, ?, ?)",
+            [(1, "admin", "admin@example.com", "admin", "admin")])
+    # Students take user ids 2 .. students + 1
+    _insert(conn, "INSERT INTO users (user_id, username, email, password, role) VALUES (?, ?, ?, ?, 'student')",
+            ((i + 1, f"s{i}", f"s{i}@example.com", f"pass{i}") for i in range(1, students + 1)))
+    _insert(conn, "INSERT INTO subjects (subject_id, name) VALUES (?, ?)",
+            ((i, f"Subject {i}") for i in range(1, subjects + 1)))
+
+    def question_rows():
+        for i in range(1, questions + 1):
+            yield (i, rng.randint(1, subjects), f"Synthetic question {i}?",
+                   f"Option A{i}", f"Option B{i}", f"Option C{i}", f"Option D{i}",
+                   rng.choice(OPTIONS), 1)
+    _insert(conn, "INSERT INTO questions (question_id, subject_id, question_text, option_a, option_b, "
+                  "option_c, option_d, correct_option, created_by) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            question_rows())
+
+    epoch = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def attempt_rows():
+        for i in range(1, attempts + 1):
+            total = rng.choice((10, 20, 25))
+            ability = rng.betavariate(5, 3)
+            correct = sum(rng.random() < ability for _ in range(total))
+            at = epoch + timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+            yield (i, rng.randint(2, students + 1), rng.randint(1, subjects), total, correct,
+                   correct / total * 100, at.strftime('%Y-%m-%dT%H:%M:%S.000+00:00'))
+    _insert(conn, "INSERT INTO attempts (attempt_id, user_id, subject_id, total_questions, correct_answers, "
+                  "score, started_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            attempt_rows())
+
+    # Rollups, as StatsDAO.rebuild() would compute them
+    conn.execute("INSERT INTO student_stats SELECT user_id, COUNT(*), SUM(score), MAX(score), MAX(started_at) "
+                 "FROM attempts GROUP BY user_id")
+    conn.execute("INSERT INTO student_subject_stats SELECT user_id, subject_id, COUNT(*), SUM(score), MAX(score), "
+                 "MAX(started_at) FROM attempts GROUP BY user_id, subject_id")
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    print(f"✅ Generated {students} students, {subjects} subjects, {questions} questions and "
+          f"{attempts} attempts in {time.perf_counter() - started:.1f}s -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=os.path.join("data", "bench.db"))
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--subjects", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=50000)
+    parser.add_argument("--attempts", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    generate(args.out, args.students, args.subjects, args.questions, args.attempts, args.seed)
+
+
+if __name__ == "__main__":
+    main()
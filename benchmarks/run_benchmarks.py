@@ -0,0 +1,220 @@
+# benchmarks/run_benchmarks.py
+"""Benchmark the services and DAOs against a synthetic SQLite database.
+
+Runs every operation against a throwaway copy of the generated database
+and reports latency percentiles, throughput and backend queries per call:
+
+    python benchmarks/generate_data.py --out data/bench.db
+    python benchmarks/run_benchmarks.py --db data/bench.db --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --db data/bench.db --compare benchmarks/baseline.json
+
+Caches are warm after the first call of each operation, as in production.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(current_dir), 'src'))
+
+
+def _load_services(db_path):
+    # Settings are read lazily, so pointing the backend at the copy here is enough
+    os.environ["EDUQUIZ_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = db_path
+    from services.auth_service import AuthService
+    from services.student_service import StudentService
+    from services.admin_service import AdminService
+    from services.question_service import QuestionService
+    from services.dashboard_service import DashboardService
+    from dao.attempt_dao import AttemptDAO
+    from dao.user_dao import UserDAO
+    from dao.unit_of_work import request_scope
+    return {
+        "auth": AuthService(), "student": StudentService(), "admin": AdminService(),
+        "question": QuestionService(), "dashboard": DashboardService(),
+        "attempts": AttemptDAO(), "users": UserDAO(), "request_scope": request_scope,
+    }
+
+
+def _dimensions(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        count = lambda table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return {"students": count("users") - 1, "subjects": count("subjects")}
+    finally:
+        conn.close()
+
+
+def build_operations(svc, dims, rng, quiz_size):
+    students, subjects = dims["students"], dims["subjects"]
+    student_id = lambda: rng.randint(2, students + 1)
+    registered = iter(range(10 ** 9))
+
+    def login():
+        n = rng.randint(1, students)
+        ok, result = svc["auth"].login(f"s{n}", f"pass{n}")
+        assert ok, result
+
+    def register():
+        n = next(registered)
+        ok, result = svc["auth"].register(f"bench{n}", f"bench{n}@example.com", "secret", "student")
+        assert ok, result
+
+    def start_quiz():
+        svc["student"].start_quiz({"user_id": student_id()}, rng.randint(1, subjects), count=quiz_size)
+
+    def submit_answers():
+        # Submissions are only accepted for a quiz issued to the same student
+        user_id, subject_id = student_id(), rng.randint(1, subjects)
+        ok, questions = svc["student"].plan_quiz({"user_id": user_id}, subject_id, count=quiz_size)
+        ids = questions if ok else []
+        answers = {qid: rng.choice("ABCD") for qid in ids}
+        attempt, result = svc["student"].submit_answers(user_id, subject_id, answers, ids)
+        assert result is not None
+
+    def create_question():
+        ok, result = svc["question"].create_question({
+            "subject_id": rng.randint(1, subjects), "question_text": "Benchmark question?",
+            "option_a": "a", "option_b": "b", "option_c": "c", "option_d": "d",
+            "correct_option": rng.choice("ABCD"), "created_by": 1,
+        })
+        assert ok, result
+
+    # name -> (callable, share of --iterations); full scans run fewer times
+    return {
+        "auth.login": (login, 1.0),
+        "auth.register": (register, 1.0),
+        "student.start_quiz": (start_quiz, 1.0),
+        "student.submit_answers": (submit_answers, 1.0),
+        "question.create_question": (create_question, 0.5),
+        "dashboard.student_metrics": (lambda: svc["dashboard"].get_student_metrics(student_id()), 1.0),
+        "dashboard.admin_metrics": (lambda: svc["dashboard"].get_admin_metrics(), 0.5),
+        "admin.students_with_stats": (lambda: svc["admin"].get_all_students_with_stats(), 0.05),
+        "dao.user_attempts": (lambda: svc["attempts"].get_user_attempts(student_id()), 1.0),
+        "dao.top_attempts": (lambda: svc["attempts"].get_top_attempts(10, rng.randint(1, subjects)), 1.0),
+        "dao.user_by_id": (lambda: svc["users"].get_by_id(student_id()), 1.0),
+    }
+
+
+def run_operation(fn, iterations, request_scope):
+    latencies, queries = [], []
+    sink = io.StringIO()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with contextlib.redirect_stdout(sink), request_scope() as unit:
+            t0 = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - t0)
+        queries.append(unit.queries)
+        sink.seek(0)
+        sink.truncate()
+    elapsed = time.perf_counter() - started
+    ms = np.array(latencies) * 1000
+    return {
+        "iterations": iterations,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+        "ops_per_sec": iterations / elapsed if elapsed else 0.0,
+        "queries_per_op": float(np.mean(queries)),
+    }
+
+
+def print_report(results, baseline=None, tolerance=0.10, min_delta_ms=0.5):
+    header = f"{'operation':<28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'queries':>9}"
+    if baseline:
+        header += f"{'p95 vs base':>13}"
+    print(header)
+    print("-" * len(header))
+    regressions = []
+    for name, r in results.items():
+        line = (f"{name:<28}{r['iterations']:>6}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+                f"{r['p99_ms']:>10.2f}{r['ops_per_sec']:>10.1f}{r['queries_per_op']:>9.1f}")
+        base = (baseline or {}).get(name)
+        if base:
+            change = r['p95_ms'] / base['p95_ms'] - 1 if base['p95_ms'] else 0.0
+            # Sub-millisecond jitter is not a regression, extra queries always are
+            slower = change > tolerance and r['p95_ms'] - base['p95_ms'] > min_delta_ms
+            flag = ""
+            if slower or r['queries_per_op'] > base['queries_per_op']:
+                flag = " ❌"
+                regressions.append(name)
+            elif change < -tolerance:
+                flag = " ✅"
+            line += f"{change:>+12.0%}{flag}"
+        elif baseline:
+            line += f"{'new':>13}"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=os.path.join("data", "bench.db"), help="database from generate_data.py")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--quiz-size", type=int, default=20)
+    parser.add_argument("--only", help="comma-separated operation names (prefixes) to run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p95 slowdown before flagging")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore p95 changes smaller than this")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ {args.db} not found; run benchmarks/generate_data.py first")
+        sys.exit(1)
+
+    workdir = tempfile.mkdtemp(prefix="eduquiz-bench-")
+    try:
+        # Writes (register, submit, create) go to a copy so runs stay comparable
+        db_copy = os.path.join(workdir, "bench.db")
+        shutil.copyfile(args.db, db_copy)
+        with contextlib.redirect_stdout(io.StringIO()):
+            svc = _load_services(db_copy)
+        dims = _dimensions(db_copy)
+        operations = build_operations(svc, dims, random.Random(args.seed), args.quiz_size)
+        if args.only:
+            prefixes = [p.strip() for p in args.only.split(",")]
+            operations = {k: v for k, v in operations.items() if any(k.startswith(p) for p in prefixes)}
+
+        print(f"🔍 Benchmarking {len(operations)} operations against {args.db} "
+              f"({dims['students']} students, {dims['subjects']} subjects)\n")
+        results = {}
+        for name, (fn, share) in operations.items():
+            results[name] = run_operation(fn, max(1, int(args.iterations * share)), svc["request_scope"])
+
+        baseline = None
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)["results"]
+        regressions = print_report(results, baseline, args.tolerance, args.min_delta_ms)
+
+        if args.save_baseline:
+            with open(args.save_baseline, "w", encoding="utf-8") as f:
+                json.dump({"db": args.db, "dimensions": dims, "iterations": args.iterations,
+                           "results": results}, f, indent=2)
+            print(f"\n✅ Baseline saved to {args.save_baseline}")
+        if regressions:
+            print(f"\n❌ Regressed: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 import time
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Add backend to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,12 +24,20 @@ else:
 # Import backend services
 try:
     from services.auth_service import AuthService
-    from services.student_service import StudentService
+    from services.student_service import StudentService, QuizNotIssued
     from services.admin_service import AdminService
+    from services.leaderboard_service import LeaderboardService
+    from services.dashboard_service import DashboardService
+    from services.import_service import QuestionImportService
+    from services.export_service import ExportService, EXPORT_COLUMNS, EXPORT_FORMATS
     from dao.question_dao import QuestionDAO
     from dao.attempt_dao import AttemptDAO
     from dao.user_dao import UserDAO
-    from dao.supabase_client import client
+    from dao.subject_dao import SubjectDAO
+    from dao.stats_dao import StatsDAO
+    from dao.config import get_bool_setting, get_int_setting
+    from dao.unit_of_work import request_scope
+    from dao.metrics import start_metrics_server
     print("✅ Backend services imported successfully")
 except ImportError as e:
     st.error(f"❌ Backend import error: {e}")
@@ -117,7 +126,10 @@ def initialize_session_state():
         'authenticated': False,
         'current_page': 'Login',
         'quiz_started': False,
-        'current_questions': [],
+        'quiz_question_ids': [],
+        'quiz_page': 0,
+        'quiz_pages': {},
+        'quiz_prefetch': {},
         'current_answers': {},
         'quiz_subject_id': None,
         'quiz_start_time': None,
@@ -259,50 +271,27 @@ def student_dashboard():
         </div>
         """, unsafe_allow_html=True)
     
+    # Both cards are computed from a single attempts fetch
+    try:
+        student_metrics = DashboardService().get_student_metrics(st.session_state.user["user_id"])
+    except Exception:
+        student_metrics = {'quizzes_taken': 0, 'avg_score': 0}
+    
     with col2:
-        # Get user attempts count
-        try:
-            attempt_dao = AttemptDAO()
-            attempts = attempt_dao.get_user_attempts(st.session_state.user["user_id"])
-            attempts_count = len(attempts)
-            
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>📊 Quizzes Taken</h3>
-                <h1 style="font-size: 3rem; margin: 0;">{attempts_count}</h1>
-            </div>
-            """, unsafe_allow_html=True)
-        except:
-            st.markdown("""
-            <div class="metric-card">
-                <h3>📊 Quizzes Taken</h3>
-                <h1 style="font-size: 3rem; margin: 0;">0</h1>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>📊 Quizzes Taken</h3>
+            <h1 style="font-size: 3rem; margin: 0;">{student_metrics['quizzes_taken']}</h1>
+        </div>
+        """, unsafe_allow_html=True)
     
     with col3:
-        # Calculate average score
-        try:
-            attempt_dao = AttemptDAO()
-            attempts = attempt_dao.get_user_attempts(st.session_state.user["user_id"])
-            if attempts:
-                avg_score = sum((a['correct_answers'] / a['total_questions'] * 100) for a in attempts) / len(attempts)
-            else:
-                avg_score = 0
-                
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>🎯 Average Score</h3>
-                <h1 style="font-size: 3rem; margin: 0;">{avg_score:.1f}%</h1>
-            </div>
-            """, unsafe_allow_html=True)
-        except:
-            st.markdown("""
-            <div class="metric-card">
-                <h3>🎯 Average Score</h3>
-                <h1 style="font-size: 3rem; margin: 0;">0%</h1>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>🎯 Average Score</h3>
+            <h1 style="font-size: 3rem; margin: 0;">{student_metrics['avg_score']:.1f}%</h1>
+        </div>
+        """, unsafe_allow_html=True)
     
     with col4:
         st.markdown("""
@@ -335,50 +324,36 @@ def student_dashboard():
 
 def admin_dashboard():
     """Admin dashboard with management features"""
-    # Admin metrics
+    # Admin metrics, fetched concurrently
+    try:
+        metrics = DashboardService().get_admin_metrics()
+    except Exception:
+        metrics = {}
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        try:
-            admin_service = AdminService()
-            students = admin_service.get_students()
-            st.metric("👥 Total Students", len(students))
-        except:
-            st.metric("👥 Total Students", 0)
+        st.metric("👥 Total Students", metrics.get('total_students') or 0)
     
     with col2:
-        try:
-            question_dao = QuestionDAO()
-            total_questions = question_dao.get_total_questions_count()
-            st.metric("❓ Total Questions", total_questions)
-        except:
-            st.metric("❓ Total Questions", 0)
+        st.metric("❓ Total Questions", metrics.get('total_questions') or 0)
     
     with col3:
-        try:
-            attempt_dao = AttemptDAO()
-            attempts_res = client.table("attempts").select("attempt_id", count="exact").execute()
-            total_attempts = attempts_res.count if hasattr(attempts_res, 'count') else len(attempts_res.data)
-            st.metric("📊 Total Attempts", total_attempts)
-        except:
-            st.metric("📊 Total Attempts", 0)
+        st.metric("📊 Total Attempts", metrics.get('total_attempts') or 0)
     
     with col4:
-        try:
-            subjects_res = client.table("subjects").select("subject_id", count="exact").execute()
-            total_subjects = subjects_res.count if hasattr(subjects_res, 'count') else len(subjects_res.data)
-            st.metric("📚 Total Subjects", total_subjects)
-        except:
-            st.metric("📚 Total Subjects", "N/A")
+        total_subjects = metrics.get('total_subjects')
+        st.metric("📚 Total Subjects", total_subjects if total_subjects is not None else "N/A")
     
     # Admin management tabs
     st.markdown("---")
     
     # Tabs for different management sections
-    tab1, tab2, tab3 = st.tabs([
+    tab1, tab2, tab3, tab4 = st.tabs([
         "👥 Student Management", 
         "❓ Question Management", 
-        "📈 Analytics & Leaderboard"
+        "📈 Analytics & Leaderboard",
+        "📤 Data Export"
     ])
     
     # Set the current tab
@@ -393,6 +368,46 @@ def admin_dashboard():
     
     with tab3:
         analytics_leaderboard_section()
+    
+    with tab4:
+        data_export_section()
+
+def data_export_section():
+    """Data export section for admins"""
+    st.markdown("### 📤 Data Export")
+    st.markdown("Exports are streamed page by page to a file on the server, "
+                "so even very large tables are never loaded into memory at once.")
+    
+    with st.form("data_export_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            dataset = st.selectbox("Dataset:", list(EXPORT_COLUMNS.keys()))
+        with col2:
+            fmt = st.selectbox("Format:", EXPORT_FORMATS)
+        
+        export_btn = st.form_submit_button("📤 Export", type="primary", use_container_width=True)
+    
+    if export_btn:
+        with st.spinner(f"Exporting {dataset}..."):
+            ok, res = ExportService().export_to_file(dataset, fmt)
+        
+        if ok:
+            st.success(f"✅ Exported {res['rows']} rows to `{res['path']}`")
+            st.session_state.last_export = res
+        else:
+            st.error(f"❌ Export failed: {res}")
+    
+    last_export = st.session_state.get('last_export')
+    if last_export and os.path.exists(last_export['path']):
+        # The file is only read into the page when asked for, not on every admin rerun
+        if st.button("📦 Prepare download of last export", key="export_prepare", use_container_width=True):
+            with open(last_export['path'], "rb") as f:
+                st.download_button(
+                    "⬇️ Download last export",
+                    data=f,
+                    file_name=os.path.basename(last_export['path']),
+                    use_container_width=True
+                )
 
 def student_management_section():
     """Student management section for admins"""
@@ -468,7 +483,9 @@ def question_management_section():
     st.markdown("### ❓ Question Management")
     
     # Tabs for different operations
-    qtab1, qtab2, qtab3 = st.tabs(["➕ Add Question", "✏️ Modify Question", "🗑️ Delete Question"])
+    qtab1, qtab2, qtab3, qtab4, qtab5 = st.tabs([
+        "➕ Add Question", "✏️ Modify Question", "🗑️ Delete Question", "📥 Bulk Import", "📊 Item Analytics"
+    ])
     
     with qtab1:
         add_question_section()
@@ -478,6 +495,12 @@ def question_management_section():
     
     with qtab3:
         delete_question_section()
+    
+    with qtab4:
+        bulk_import_section()
+    
+    with qtab5:
+        item_analytics_section()
 
 def add_question_section():
     """Add question section"""
@@ -485,7 +508,7 @@ def add_question_section():
     
     try:
         # Show available subjects
-        subjects = client.table("subjects").select("*").execute().data
+        subjects = SubjectDAO().get_all()
         if not subjects:
             st.error("❌ No subjects available. Please create subjects first.")
             return
@@ -544,14 +567,103 @@ def add_question_section():
     except Exception as e:
         st.error(f"❌ Error adding question: {str(e)}")
 
+def bulk_import_section():
+    """Bulk question import section"""
+    st.markdown("#### 📥 Bulk Import Questions")
+    st.markdown("Upload a CSV, JSON or JSON Lines file with the columns "
+                "`subject_id, question_text, option_a, option_b, option_c, option_d, correct_option`.")
+    
+    with st.form("bulk_import_form"):
+        uploaded_file = st.file_uploader("Question file", type=["csv", "json", "jsonl"])
+        batch_size = st.number_input("Batch size", min_value=1, max_value=5000, value=500, step=50)
+        import_btn = st.form_submit_button("📥 Import Questions", type="primary", use_container_width=True)
+        
+        if import_btn:
+            if not uploaded_file:
+                st.error("❌ Please choose a file to import")
+            else:
+                with st.spinner("Importing questions..."):
+                    ok, report = QuestionImportService().import_upload(
+                        uploaded_file, st.session_state.user['user_id'], int(batch_size)
+                    )
+                
+                if not ok:
+                    st.error(f"❌ {report}")
+                else:
+                    st.success(f"✅ Imported {report['imported']} of {report['total']} rows")
+                    if report['failed']:
+                        st.warning(f"⚠️ {report['failed']} rows failed")
+                        st.dataframe(report['errors'], use_container_width=True)
+
+def item_analytics_section():
+    """Per-question difficulty, discrimination and option choices"""
+    st.markdown("#### 📊 Item Analytics")
+    st.markdown("**P-value**: share answering correctly. **Discrimination**: point-biserial correlation "
+                "with the attempt score (below 0.2 means the question barely separates strong from weak students).")
+    
+    try:
+        subjects = SubjectDAO().get_all()
+        if not subjects:
+            st.info("No subjects available.")
+            return
+        
+        subject_options = {f"{s['subject_id']}. {s['name']}": s['subject_id'] for s in subjects}
+        selected_subject = st.selectbox("Subject:", list(subject_options.keys()), key="item_analytics_subject")
+        subject_id = subject_options[selected_subject]
+        
+        # Computed only on request: this tab renders on every admin page rerun
+        reports = st.session_state.setdefault('item_analytics_reports', {})
+        if st.button("📊 Load Analytics" if subject_id not in reports else "🔄 Refresh", key="item_analytics_load"):
+            with st.spinner("Computing item statistics..."):
+                ok, report = AdminService().get_item_analytics(subject_id, refresh=subject_id in reports)
+            if not ok:
+                st.error(f"❌ {report}")
+                return
+            reports[subject_id] = report
+        
+        report = reports.get(subject_id)
+        if report is None:
+            st.info("Click Load Analytics to compute statistics for this subject.")
+            return
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Responses", report['responses'])
+        with col2:
+            st.metric("Mean P-value", f"{report['mean_p_value']:.2f}" if report['mean_p_value'] is not None else "N/A")
+        with col3:
+            mean_r = report['mean_discrimination']
+            st.metric("Mean Discrimination", f"{mean_r:.2f}" if mean_r is not None else "N/A")
+        with col4:
+            st.metric("Flagged Questions", report['flagged'])
+        
+        rows = []
+        for item in report['items']:
+            counts = item.option_counts
+            rows.append({
+                "Question": item.question_id,
+                "Key": item.correct_option,
+                "Responses": item.responses,
+                "P-value": item.p_value,
+                "Discrimination": item.discrimination,
+                **{f"% {option}": round(counts.get(option, 0) / item.responses * 100, 1) if item.responses else None
+                   for option in "ABCD"},
+                "Flags": ", ".join(item.flags),
+            })
+        only_flagged = st.checkbox("Only flagged questions", key="item_analytics_flagged")
+        if only_flagged:
+            rows = [row for row in rows if row["Flags"]]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.error(f"❌ Error loading item analytics: {str(e)}")
+
 def modify_question_section():
     """Modify question section"""
     st.markdown("#### ✏️ Modify Existing Question")
     
     try:
         # Get all questions for reference
-        questions_res = client.table("questions").select("question_id, question_text, subject_id").execute()
-        questions = questions_res.data if questions_res.data else []
+        questions = QuestionDAO().get_summaries()
         
         if not questions:
             st.info("No questions available to modify.")
@@ -563,13 +675,11 @@ def modify_question_section():
         question_id = question_options[selected_question_label]
         
         # Get current question data
-        current_question_res = client.table("questions").select("*").eq("question_id", question_id).execute()
-        if not current_question_res.data:
+        current_question = QuestionDAO().get_by_id(question_id)
+        if not current_question:
             st.error("Question not found!")
             return
         
-        current_question = current_question_res.data[0]
-        
         with st.form("modify_question_form"):
             st.markdown("**Current Question Details:**")
             col1, col2 = st.columns(2)
@@ -627,8 +737,7 @@ def delete_question_section():
     
     try:
         # Get all questions for reference
-        questions_res = client.table("questions").select("question_id, question_text, subject_id").execute()
-        questions = questions_res.data if questions_res.data else []
+        questions = QuestionDAO().get_summaries()
         
         if not questions:
             st.info("No questions available to delete.")
@@ -640,10 +749,8 @@ def delete_question_section():
         question_id = question_options[selected_question_label]
         
         # Get question details for confirmation
-        question_res = client.table("questions").select("*").eq("question_id", question_id).execute()
-        if question_res.data:
-            question = question_res.data[0]
-            
+        question = QuestionDAO().get_by_id(question_id)
+        if question:
             st.warning("### ⚠️ Confirm Deletion")
             st.markdown(f"""
             **Question:** {question['question_text']}
@@ -680,27 +787,21 @@ def analytics_leaderboard_section():
     try:
         admin_service = AdminService()
         
-        # Overall statistics
+        # Overall statistics, fetched concurrently
+        metrics = DashboardService().get_admin_metrics()
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            students = admin_service.get_students()
-            st.metric("Total Students", len(students))
+            st.metric("Total Students", metrics['total_students'] or 0)
         
         with col2:
-            question_dao = QuestionDAO()
-            total_questions = question_dao.get_total_questions_count()
-            st.metric("Total Questions", total_questions)
+            st.metric("Total Questions", metrics['total_questions'] or 0)
         
         with col3:
-            attempts_res = client.table("attempts").select("attempt_id", count="exact").execute()
-            total_attempts = attempts_res.count if hasattr(attempts_res, 'count') else len(attempts_res.data)
-            st.metric("Total Quiz Attempts", total_attempts)
+            st.metric("Total Quiz Attempts", metrics['total_attempts'] or 0)
         
         with col4:
-            subjects_res = client.table("subjects").select("subject_id", count="exact").execute()
-            total_subjects = subjects_res.count if hasattr(subjects_res, 'count') else len(subjects_res.data)
-            st.metric("Total Subjects", total_subjects)
+            st.metric("Total Subjects", metrics['total_subjects'] or 0)
         
         # Student performance overview
         st.markdown("---")
@@ -761,11 +862,7 @@ def analytics_leaderboard_section():
         st.markdown("---")
         st.markdown("### 🏆 Leaderboard - Top Performers")
         
-        res = client.table("attempts").select(
-            "user_id, score, correct_answers, total_questions, users(username), subjects(name)"
-        ).order("score", desc=True).limit(10).execute()
-        
-        leaderboard_data = res.data or []
+        leaderboard_data = LeaderboardService().get_top()
         
         if leaderboard_data:
             for i, entry in enumerate(leaderboard_data, 1):
@@ -802,6 +899,67 @@ def analytics_leaderboard_section():
     except Exception as e:
         st.error(f"❌ Error loading analytics: {str(e)}")
 
+@st.cache_resource
+def quiz_prefetch_pool():
+    """Shared worker threads that load upcoming quiz pages"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="quiz-prefetch")
+
+def quiz_page_size():
+    """Questions shown per quiz page"""
+    return max(1, get_int_setting("QUIZ_PAGE_SIZE", 10))
+
+def reset_quiz_state():
+    """Clear everything belonging to the quiz in progress"""
+    st.session_state.quiz_started = False
+    st.session_state.quiz_question_ids = []
+    st.session_state.quiz_page = 0
+    st.session_state.quiz_pages = {}
+    st.session_state.quiz_prefetch = {}
+    st.session_state.current_answers = {}
+    st.session_state.quiz_subject_id = None
+
+def _page_ids(page):
+    """Question ids on one quiz page"""
+    size = quiz_page_size()
+    return st.session_state.quiz_question_ids[page * size:(page + 1) * size]
+
+def load_quiz_page(student_service, page):
+    """Questions for a quiz page, from the prefetched result when there is one"""
+    pages = st.session_state.quiz_pages
+    if page not in pages:
+        future = st.session_state.quiz_prefetch.pop(page, None)
+        try:
+            pages[page] = future.result() if future else student_service.get_quiz_questions(_page_ids(page))
+        except Exception as e:
+            print(f"❌ Error prefetching quiz page {page + 1}: {e}")
+            pages[page] = student_service.get_quiz_questions(_page_ids(page))
+    found = {q['question_id'] for q in pages[page]}
+    missing = [qid for qid in _page_ids(page) if qid not in found]
+    if missing:
+        drop_quiz_questions(missing)
+        return None
+    return pages[page]
+
+def drop_quiz_questions(question_ids):
+    """Take questions deleted since the quiz started out of it (the server no longer grades them)"""
+    dropped = set(question_ids)
+    st.session_state.quiz_question_ids = [qid for qid in st.session_state.quiz_question_ids if qid not in dropped]
+    for qid in dropped:
+        st.session_state.current_answers.pop(qid, None)
+    # Page boundaries have shifted, so loaded and prefetched pages no longer line up
+    st.session_state.quiz_pages = {}
+    st.session_state.quiz_prefetch = {}
+    st.session_state.quiz_notice = (f"{len(dropped)} question(s) were removed from this quiz because "
+                                    "they no longer exist. Your score counts only the remaining questions.")
+
+def prefetch_quiz_page(student_service, page):
+    """Start loading a quiz page in the background while the current one is answered"""
+    if page in st.session_state.quiz_pages or page in st.session_state.quiz_prefetch or not _page_ids(page):
+        return
+    st.session_state.quiz_prefetch[page] = quiz_prefetch_pool().submit(
+        student_service.get_quiz_questions, _page_ids(page)
+    )
+
 def take_quiz_section():
     """Take quiz section - ONLY for students"""
     if st.session_state.user["role"] != "student":
@@ -816,6 +974,10 @@ def take_quiz_section():
     # Initialize student_service at the beginning of the function
     student_service = StudentService()
     
+    notice = st.session_state.pop('quiz_notice', None)
+    if notice:
+        st.warning(f"⚠️ {notice}")
+    
     # Check if quiz was just submitted
     if st.session_state.get('quiz_submitted', False):
         # Show results and back button
@@ -847,15 +1009,26 @@ def take_quiz_section():
         selected_subject_label = st.selectbox("Select Subject:", list(subject_options.keys()))
         selected_subject = subject_options[selected_subject_label]
         
+        with st.expander("⚙️ Quiz Options"):
+            question_count = st.number_input("Number of questions (0 = default)", min_value=0, value=0, step=1)
+            seed_text = st.text_input("Seed (optional, for a reproducible quiz)")
+            stratify = st.checkbox("Balance answer letters across the quiz")
+        
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🎯 Start Quiz", type="primary", use_container_width=True):
                 subject_id = selected_subject['subject_id']
-                success, questions = student_service.start_quiz(st.session_state.user, subject_id)
+                seed = int(seed_text) if seed_text.strip().isdigit() else None
+                # Only the question ids are loaded up front; rows follow page by page
+                success, question_ids = student_service.plan_quiz(
+                    st.session_state.user, subject_id,
+                    count=int(question_count) or None, seed=seed, stratify=stratify
+                )
                 
-                if success and questions:
+                if success and question_ids:
+                    reset_quiz_state()
                     st.session_state.quiz_started = True
-                    st.session_state.current_questions = questions
+                    st.session_state.quiz_question_ids = question_ids
                     st.session_state.quiz_subject_id = subject_id
                     st.session_state.quiz_start_time = time.time()
                     st.session_state.current_answers = {}
@@ -871,20 +1044,36 @@ def take_quiz_section():
     
     else:
         # Quiz in progress
-        questions = st.session_state.current_questions
+        question_ids = st.session_state.quiz_question_ids
+        if not question_ids:
+            st.error("❌ None of this quiz's questions exist any more. Please start a new quiz.")
+            if st.button("🔄 Choose Another Quiz"):
+                reset_quiz_state()
+                st.rerun()
+            return
+        page_size = quiz_page_size()
+        page_count = (len(question_ids) + page_size - 1) // page_size
+        page = min(st.session_state.quiz_page, page_count - 1)
         
-        # Get current subject name for display
-        subjects = student_service.list_subjects()
-        current_subject = next((s for s in subjects 
-                              if s['subject_id'] == st.session_state.quiz_subject_id), None)
+        # Get current subject name for display (served from the shared subject catalog)
+        current_subject = student_service.get_subject(st.session_state.quiz_subject_id)
         
         st.markdown(f"### 📝 Quiz: {current_subject['name'] if current_subject else 'Unknown Subject'}")
-        st.markdown(f"**Total Questions:** {len(questions)}")
+        answered = len(st.session_state.current_answers)
+        st.markdown(f"**Total Questions:** {len(question_ids)} | **Answered:** {answered} | **Page** {page + 1} of {page_count}")
+        st.progress(answered / len(question_ids))
         st.markdown("---")
         
-        # Display questions
-        with st.form("quiz_form"):
-            for i, question in enumerate(questions, 1):
+        # Only this page's questions are rendered; the next page loads in the background
+        questions = load_quiz_page(student_service, page)
+        if questions is None:
+            # Some questions were deleted; lay the pages out again without them
+            st.rerun()
+        prefetch_quiz_page(student_service, page + 1)
+        first_number = page * page_size + 1
+        
+        with st.form(f"quiz_form_{page}"):
+            for i, question in enumerate(questions, first_number):
                 with st.container():
                     st.markdown(f"**Q{i}: {question['question_text']}**")
                     
@@ -906,11 +1095,13 @@ def take_quiz_section():
                     if question.get('option_d'):
                         options.append('D')
                     
+                    # Restore the earlier choice when returning to a page
+                    previous = st.session_state.current_answers.get(question['question_id'])
                     answer = st.radio(
                         f"Select your answer for Q{i}:",
                         options,
                         key=f"q_{question['question_id']}",
-                        index=None,
+                        index=options.index(previous) if previous in options else None,
                         horizontal=True
                     )
                     
@@ -920,30 +1111,41 @@ def take_quiz_section():
                     st.markdown("---")
             
             col1, col2, col3 = st.columns([1, 1, 1])
+            with col1:
+                prev_btn = st.form_submit_button("⬅️ Previous", use_container_width=True, disabled=page == 0)
             with col2:
                 submit_btn = st.form_submit_button("✅ Submit Quiz", type="primary", use_container_width=True)
+            with col3:
+                next_btn = st.form_submit_button("Next ➡️", use_container_width=True, disabled=page >= page_count - 1)
+            
+            if prev_btn or next_btn:
+                st.session_state.quiz_page = page - 1 if prev_btn else page + 1
+                st.rerun()
             
             if submit_btn:
-                if len(st.session_state.current_answers) == len(questions):
+                if len(st.session_state.current_answers) == len(question_ids):
                     with st.spinner("Submitting your answers..."):
-                        # Calculate score
-                        correct_answers = 0
-                        for question in questions:
-                            user_answer = st.session_state.current_answers.get(question['question_id'])
-                            if user_answer and user_answer.upper() == question['correct_option'].upper():
-                                correct_answers += 1
-                        
-                        total_questions = len(questions)
-                        score_percentage = (correct_answers / total_questions) * 100
+                        # Grade on the server against the subject's answer key and save attempt
+                        try:
+                            attempt, result = student_service.submit_answers(
+                                st.session_state.user["user_id"],
+                                st.session_state.quiz_subject_id,
+                                st.session_state.current_answers,
+                                question_ids
+                            )
+                        except QuizNotIssued:
+                            # Expired or lost on a server restart; resubmitting cannot succeed
+                            reset_quiz_state()
+                            st.session_state.quiz_notice = ("This quiz has expired and can no longer be submitted. "
+                                                            "Please start the quiz again.")
+                            st.rerun()
+                        if result is None:
+                            st.error("❌ Failed to grade quiz. Please try again.")
+                            return
                         
-                        # Save attempt
-                        student_service = StudentService()
-                        attempt = student_service.submit_attempt(
-                            st.session_state.user["user_id"],
-                            st.session_state.quiz_subject_id,
-                            total_questions,
-                            correct_answers
-                        )
+                        correct_answers = result.correct_count
+                        total_questions = result.total
+                        score_percentage = result.score
                         
                         # Show results
                         st.markdown(f"""
@@ -962,16 +1164,18 @@ def take_quiz_section():
                             st.warning("⚠️ Results could not be saved.")
                         
                         # Reset quiz state and set submitted flag
-                        st.session_state.quiz_started = False
-                        st.session_state.current_questions = []
-                        st.session_state.current_answers = {}
-                        st.session_state.quiz_subject_id = None
+                        reset_quiz_state()
                         st.session_state.quiz_submitted = True
                         
                         # Rerun to show the results page
                         st.rerun()
                 else:
-                    st.warning("⚠️ Please answer all questions before submitting.")
+                    unanswered_pages = sorted({
+                        i // page_size + 1 for i, qid in enumerate(question_ids)
+                        if qid not in st.session_state.current_answers
+                    })
+                    st.warning(f"⚠️ Please answer all questions before submitting. Unanswered questions on page(s): "
+                               f"{', '.join(map(str, unanswered_pages))}")
 
 def view_attempts_section():
     """View attempts section - ONLY for students"""
@@ -1002,14 +1206,9 @@ def view_attempts_section():
         st.markdown("---")
         
         for i, attempt in enumerate(attempts, 1):
-            score_percent = (attempt['correct_answers'] / attempt['total_questions']) * 100
-            
             # Get subject name
-            try:
-                subject_res = client.table("subjects").select("name").eq("subject_id", attempt['subject_id']).execute()
-                subject_name = subject_res.data[0]['name'] if subject_res.data else f"Subject {attempt['subject_id']}"
-            except:
-                subject_name = f"Subject {attempt['subject_id']}"
+            subject = SubjectDAO().get_by_id(attempt['subject_id'])
+            subject_name = subject['name'] if subject else f"Subject {attempt['subject_id']}"
             
             with st.container():
                 col1, col2, col3, col4 = st.columns([2, 2, 2, 3])
@@ -1017,7 +1216,7 @@ def view_attempts_section():
                 with col1:
                     st.write(f"**{subject_name}**")
                 with col2:
-                    st.write(f"Score: {score_percent:.1f}%")
+                    st.write(f"Score: {attempt['score']:.1f}%")
                 with col3:
                     st.write(f"Correct: {attempt['correct_answers']}/{attempt['total_questions']}")
                 with col4:
@@ -1038,8 +1237,8 @@ def view_attempts_section():
         col1, col2, col3, col4 = st.columns(4)
         
         total_quizzes = len(attempts)
-        avg_score = sum((a['correct_answers'] / a['total_questions'] * 100) for a in attempts) / total_quizzes
-        best_score = max((a['correct_answers'] / a['total_questions'] * 100) for a in attempts)
+        avg_score = sum(a['score'] for a in attempts) / total_quizzes
+        best_score = max(a['score'] for a in attempts)
         total_correct = sum(a['correct_answers'] for a in attempts)
         total_questions = sum(a['total_questions'] for a in attempts)
         
@@ -1051,6 +1250,22 @@ def view_attempts_section():
             st.metric("Best Score", f"{best_score:.1f}%")
         with col4:
             st.metric("Total Correct", f"{total_correct}/{total_questions}")
+        
+        # Per-subject breakdown straight from the rollups
+        subject_stats = StatsDAO().get_student_subjects(st.session_state.user["user_id"])
+        if subject_stats:
+            st.markdown("#### By Subject")
+            subject_dao = SubjectDAO()
+            st.dataframe(pd.DataFrame([
+                {
+                    'Subject': (subject_dao.get_by_id(row.subject_id) or {}).get('name', f"Subject {row.subject_id}"),
+                    'Attempts': row.attempt_count,
+                    'Average Score': f"{row.avg_score():.1f}%",
+                    'Best Score': f"{row.best_score:.1f}%",
+                    'Last Attempt': (row.last_attempt_at or '')[:10],
+                }
+                for row in subject_stats
+            ]), use_container_width=True, hide_index=True)
             
     except Exception as e:
         st.error(f"❌ Error loading results: {str(e)}")
@@ -1065,12 +1280,13 @@ def leaderboard_section():
     st.markdown('<div class="main-header">🏆 Leaderboard</div>', unsafe_allow_html=True)
     
     try:
-        # Get top attempts
-        res = client.table("attempts").select(
-            "user_id, score, correct_answers, total_questions, users(username), subjects(name)"
-        ).order("score", desc=True).limit(10).execute()
+        # Optional subject filter
+        subject_options = {"All Subjects": None}
+        subject_options.update({f"{s['subject_id']}. {s['name']}": s['subject_id'] for s in SubjectDAO().get_all()})
+        selected_subject = st.selectbox("Filter by Subject:", list(subject_options.keys()))
         
-        leaderboard_data = res.data or []
+        # Get top attempts from the in-memory leaderboard
+        leaderboard_data = LeaderboardService().get_top(subject_options[selected_subject])
         
         if not leaderboard_data:
             st.info("📊 No quiz attempts yet. Be the first to appear on the leaderboard!")
@@ -1144,9 +1360,7 @@ def sidebar():
                 st.session_state.authenticated = False
                 st.session_state.user = None
                 st.session_state.current_page = "Login"
-                st.session_state.quiz_started = False
-                st.session_state.current_questions = []
-                st.session_state.current_answers = {}
+                reset_quiz_state()
                 st.session_state.quiz_submitted = False
                 st.rerun()
         else:
@@ -1157,24 +1371,33 @@ def main():
     """Main application"""
     load_css()
     initialize_session_state()
-    sidebar()
+    start_metrics_server()
     
-    # Route to current page
-    pages = {
-        "Login": login_section,
-        "Register": register_section, 
-        "Dashboard": dashboard_section,
-        "Take Quiz": take_quiz_section,
-        "My Results": view_attempts_section,
-        "Leaderboard": leaderboard_section
-    }
-    
-    current_page = st.session_state.current_page
-    if current_page in pages:
-        pages[current_page]()
-    else:
-        st.session_state.current_page = "Login"
-        st.rerun()
+    # Identical DAO reads within one script run hit the backend once
+    with request_scope(st.session_state.current_page) as unit:
+        sidebar()
+        
+        # Route to current page
+        pages = {
+            "Login": login_section,
+            "Register": register_section, 
+            "Dashboard": dashboard_section,
+            "Take Quiz": take_quiz_section,
+            "My Results": view_attempts_section,
+            "Leaderboard": leaderboard_section
+        }
+        
+        current_page = st.session_state.current_page
+        if current_page in pages:
+            pages[current_page]()
+        else:
+            st.session_state.current_page = "Login"
+            st.rerun()
+        
+        if get_bool_setting("DEBUG_QUERY_COUNTER"):
+            stats = unit.stats()
+            print(f"🔍 {current_page}: {stats['queries']} queries, {stats['memo_hits']} memo hits")
+            st.sidebar.caption(f"🔍 {stats['queries']} queries this run ({stats['memo_hits']} served from memo)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+-- Per-question responses of every attempt, written in one insert per submission.
+-- Run once in the Supabase SQL editor (table, view and function). (attempt_id, question_id) serves per-attempt
+-- and, through attempts.user_id, per-student lookups; the question index serves
+-- item analytics.
+create table if not exists attempt_answers (
+    answer_id bigint generated by default as identity primary key,
+    attempt_id bigint not null references attempts (attempt_id) on delete cascade,
+    question_id bigint not null references questions (question_id) on delete cascade,
+    chosen_option char(1) check (chosen_option in ('A', 'B', 'C', 'D')),
+    is_correct boolean not null,
+    unique (attempt_id, question_id)
+);
+create index if not exists attempt_answers_question_id_idx on attempt_answers (question_id, is_correct);
+
+-- Item analytics (services/item_analytics.py) reads responses aggregated per
+-- (question, option): a few rows per question however many answers are stored.
+create or replace view question_option_stats as
+select aa.question_id, aa.chosen_option, count(*) as responses,
+       sum(a.score) as score_sum, sum(a.score * a.score) as score_squares
+from attempt_answers aa join attempts a on a.attempt_id = aa.attempt_id
+group by aa.question_id, aa.chosen_option;
+
+-- Stores attempts and their answers in one transaction (AttemptDAO.record_attempts).
+-- p_attempts: [{user_id, subject_id, total_questions, correct_answers, score,
+-- started_at, answers: [{question_id, chosen_option, is_correct}]}]. Answers to
+-- questions deleted since grading are skipped.
+create or replace function record_attempts(p_attempts jsonb)
+returns setof attempts language plpgsql as $$
+declare
+    item jsonb;
+    saved attempts;
+begin
+    for item in select value from jsonb_array_elements(p_attempts) loop
+        insert into attempts (user_id, subject_id, total_questions, correct_answers, score, started_at)
+        values ((item->>'user_id')::bigint, (item->>'subject_id')::bigint, (item->>'total_questions')::integer,
+                (item->>'correct_answers')::integer, (item->>'score')::double precision,
+                coalesce((item->>'started_at')::timestamptz, now()))
+        returning * into saved;
+        insert into attempt_answers (attempt_id, question_id, chosen_option, is_correct)
+        select saved.attempt_id, (a->>'question_id')::bigint, a->>'chosen_option', (a->>'is_correct')::boolean
+        from jsonb_array_elements(coalesce(item->'answers', '[]'::jsonb)) as a
+        where exists (select 1 from questions q where q.question_id = (a->>'question_id')::bigint);
+        return next saved;
+    end loop;
+end;
+$$;
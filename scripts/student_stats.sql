@@ -0,0 +1,57 @@
+-- Attempt rollups read by the dashboards and admin statistics.
+-- Run once in the Supabase SQL editor (tables and the functions below), then use "Rebuild Student Stats"
+-- from the CLI admin menu to backfill them from existing attempts.
+create table if not exists student_stats (
+    user_id bigint primary key references users (user_id),
+    attempt_count integer not null default 0,
+    score_sum double precision not null default 0,
+    best_score double precision,
+    last_attempt_at timestamptz
+);
+
+create table if not exists student_subject_stats (
+    user_id bigint not null references users (user_id),
+    subject_id bigint not null references subjects (subject_id),
+    attempt_count integer not null default 0,
+    score_sum double precision not null default 0,
+    best_score double precision,
+    last_attempt_at timestamptz,
+    primary key (user_id, subject_id)
+);
+
+-- Folds one attempt into both rollup rows atomically (StatsDAO.record_attempt).
+create or replace function record_student_attempt(
+    p_user_id bigint, p_subject_id bigint, p_score double precision, p_attempted_at timestamptz
+) returns void language sql as $$
+    insert into student_stats as s (user_id, attempt_count, score_sum, best_score, last_attempt_at)
+    values (p_user_id, 1, p_score, p_score, p_attempted_at)
+    on conflict (user_id) do update set
+        attempt_count = s.attempt_count + 1,
+        score_sum = s.score_sum + excluded.score_sum,
+        best_score = greatest(s.best_score, excluded.best_score),
+        last_attempt_at = greatest(s.last_attempt_at, excluded.last_attempt_at);
+    insert into student_subject_stats as s (user_id, subject_id, attempt_count, score_sum, best_score, last_attempt_at)
+    values (p_user_id, p_subject_id, 1, p_score, p_score, p_attempted_at)
+    on conflict (user_id, subject_id) do update set
+        attempt_count = s.attempt_count + 1,
+        score_sum = s.score_sum + excluded.score_sum,
+        best_score = greatest(s.best_score, excluded.best_score),
+        last_attempt_at = greatest(s.last_attempt_at, excluded.last_attempt_at);
+$$;
+
+-- Recomputes both rollups from attempts in one transaction (StatsDAO.rebuild).
+-- The table locks make concurrent record_student_attempt calls wait for it.
+create or replace function rebuild_student_stats()
+returns table (students bigint, pairs bigint) language plpgsql as $$
+begin
+    lock table student_stats, student_subject_stats in exclusive mode;
+    delete from student_subject_stats where true;
+    delete from student_stats where true;
+    insert into student_stats (user_id, attempt_count, score_sum, best_score, last_attempt_at)
+    select user_id, count(*), sum(score), max(score), max(started_at) from attempts group by user_id;
+    insert into student_subject_stats (user_id, subject_id, attempt_count, score_sum, best_score, last_attempt_at)
+    select user_id, subject_id, count(*), sum(score), max(score), max(started_at)
+    from attempts group by user_id, subject_id;
+    return query select (select count(*) from student_stats), (select count(*) from student_subject_stats);
+end;
+$$;
@@ -0,0 +1,5 @@
+-- Registration inserts users directly and relies on these constraints to
+-- reject duplicates ("Username already exists" / "Email already exists").
+-- Run once in the Supabase SQL editor if the users table lacks them.
+alter table users add constraint users_username_key unique (username);
+alter table users add constraint users_email_key unique (email);
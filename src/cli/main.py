@@ -9,11 +9,18 @@ sys.path.insert(0, src_dir)
 
 try:
     from services.auth_service import AuthService
-    from services.student_service import StudentService
+    from services.student_service import StudentService, QuizNotIssued
     from services.admin_service import AdminService
+    from services.leaderboard_service import LeaderboardService
+    from services.import_service import QuestionImportService
+    from services.export_service import ExportService, EXPORT_COLUMNS, EXPORT_FORMATS
+    from services.passwords import get_hasher
+    from services.attempt_queue import current_attempt_queue
     from dao.attempt_dao import AttemptDAO
     from dao.question_dao import QuestionDAO
-    from dao.supabase_client import client
+    from dao.subject_dao import SubjectDAO
+    from dao.db import get_client
+    from dao.metrics import registry as metrics, start_metrics_server
     
     print("✅ All imports successful")
 except ImportError as e:
@@ -146,7 +153,18 @@ def take_quiz_flow(user):
         print("❌ Invalid subject ID.")
         return
     
-    ok, qs = student_svc.start_quiz(user, subj_id)
+    # Optional quiz generation settings; blank keeps the defaults
+    count = input("Number of questions (Enter for default): ").strip()
+    seed = input("Seed for a reproducible quiz (Enter for random): ").strip()
+    stratify = input("Balance answer letters across the quiz? (y/N): ").strip().lower() == 'y'
+    try:
+        count = int(count) if count else None
+        seed = int(seed) if seed else None
+    except ValueError:
+        print("❌ Question count and seed must be numbers.")
+        return
+    
+    ok, qs = student_svc.start_quiz(user, subj_id, count=count, seed=seed, stratify=stratify)
     if not ok:
         print(f"❌ {qs}")
         return
@@ -156,7 +174,7 @@ def take_quiz_flow(user):
         return
     
     total = len(qs)
-    correct = 0
+    answers = {}
     
     print(f"\n📝 Starting quiz with {total} questions...")
     print("="*50)
@@ -176,21 +194,32 @@ def take_quiz_flow(user):
                 break
             print("❌ Please enter A, B, C, or D")
         
-        if ans == q["correct_option"].upper():
-            print("✅ Correct!")
-            correct += 1
-        else:
-            print(f"❌ Wrong! Correct answer: {q['correct_option'].upper()}")
+        answers[q['question_id']] = ans
+    
+    # Graded by the service; the quiz payload carries no answers
+    try:
+        attempt, result = student_svc.submit_answers(
+            user["user_id"], subj_id, answers, [q['question_id'] for q in qs]
+        )
+    except QuizNotIssued:
+        print("❌ This quiz has expired and can no longer be submitted. Please start the quiz again.")
+        return
+    if result is None:
+        print("❌ Failed to grade quiz. Please try again.")
+        return
     
-    # Submit attempt
-    attempt = student_svc.submit_attempt(user["user_id"], subj_id, total, correct)
+    correct = result.correct_count
+    total = result.total
     
     print("\n" + "="*50)
     print("                 Quiz Results")
     print("="*50)
+    for i, is_correct in enumerate(result.correct, 1):
+        print(f"Q{i}: {'✅ Correct' if is_correct else '❌ Wrong'}")
+    print("-"*50)
     print(f"Total Questions: {total}")
     print(f"Correct Answers: {correct}")
-    print(f"Score: {(correct/total)*100:.2f}% ({correct}/{total})")
+    print(f"Score: {result.score:.2f}% ({correct}/{total})")
     
     if attempt:
         print("✅ Results saved successfully!")
@@ -210,18 +239,16 @@ def view_attempts(user):
         return
     
     for i, attempt in enumerate(attempts, 1):
-        score_percent = (attempt['correct_answers'] / attempt['total_questions']) * 100
         print(f"{i}. Subject {attempt['subject_id']} - "
-              f"Score: {score_percent:.1f}% ({attempt['correct_answers']}/{attempt['total_questions']}) - "
+              f"Score: {attempt['score']:.1f}% ({attempt['correct_answers']}/{attempt['total_questions']}) - "
               f"Date: {attempt.get('started_at', 'N/A')}")
 
 def show_leaderboard():
     try:
-        res = client.table("attempts").select(
-            "user_id, score, correct_answers, total_questions, users(username), subjects(name)"
-        ).order("score", desc=True).limit(10).execute()
+        subj = input("Subject ID (press Enter for all subjects): ").strip()
+        subject_id = int(subj) if subj else None
         
-        rows = res.data or []
+        rows = LeaderboardService().get_top(subject_id)
         
         print("\n" + "="*50)
         print("               Leaderboard - Top Scores")
@@ -240,6 +267,8 @@ def show_leaderboard():
             
             print(f"{i}. {username} - {subject_name} - {score:.1f}% ({correct}/{total})")
             
+    except ValueError:
+        print("❌ Please enter a valid subject ID (number).")
     except Exception as e:
         print(f"❌ Error loading leaderboard: {e}")
 
@@ -253,10 +282,13 @@ def admin_menu(user):
         print("3. Check Quiz Status")
         print("4. View Leaderboard")
         print("5. Student Statistics")
-        print("6. Logout")
+        print("6. Export Data")
+        print("7. Rebuild Student Stats")
+        print("8. View Metrics")
+        print("9. Logout")
         print("-"*50)
         
-        choice = input("Choose option (1-6): ").strip()
+        choice = input("Choose option (1-9): ").strip()
         
         if choice == "1":
             view_all_students()
@@ -269,10 +301,16 @@ def admin_menu(user):
         elif choice == "5":
             show_student_stats()
         elif choice == "6":
+            export_data_flow()
+        elif choice == "7":
+            rebuild_stats_flow()
+        elif choice == "8":
+            view_metrics_flow()
+        elif choice == "9":
             print("👋 Logging out...")
             break
         else:
-            print("❌ Invalid choice. Please enter 1-6.")
+            print("❌ Invalid choice. Please enter 1-9.")
 
 def view_all_students():
     students = admin_svc.get_students()
@@ -293,7 +331,7 @@ def view_all_students():
 
 def check_quiz_status():
     try:
-        subjects = client.table("subjects").select("*").execute().data
+        subjects = SubjectDAO().get_all()
         if not subjects:
             print("❌ No subjects found.")
             return
@@ -334,6 +372,77 @@ def show_student_stats():
         print(f"   📅 Joined: {student['joined']}")
         print("-" * 30)
 
+def rebuild_stats_flow():
+    print("\n🔧 Recomputing student statistics from all attempts...")
+    ok, result = admin_svc.rebuild_student_stats()
+    if ok:
+        students, pairs = result
+        print(f"✅ Rebuilt stats for {students} students ({pairs} student/subject pairs)")
+    else:
+        print(f"❌ Error: {result}")
+
+def view_metrics_flow():
+    rows = metrics.snapshot()
+    
+    print("\n" + "="*50)
+    print("          Query Metrics (slowest total first)")
+    print("="*50)
+    
+    if not rows:
+        print("No calls recorded yet.")
+        return
+    
+    print(f"{'layer':<8}{'operation':<36}{'calls':>7}{'err':>5}{'rows':>9}{'avg ms':>9}{'p95 ms':>9}{'total ms':>10}")
+    for r in rows[:25]:
+        print(f"{r['layer']:<8}{r['operation'][:35]:<36}{r['calls']:>7}{r['errors']:>5}{r['rows']:>9}"
+              f"{r['avg_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['total_ms']:>10.1f}")
+    
+    hasher = get_hasher().stats()
+    print(f"\n🔐 Password hashing: {hasher['completed']} done, queue depth {hasher['queue_depth']} "
+          f"(peak {hasher['peak_queue_depth']}), {hasher['rejected']} rejected, avg {hasher['avg_ms']:.0f} ms")
+    
+    if current_attempt_queue():
+        queue = current_attempt_queue().stats()
+        print(f"📥 Attempt queue: {queue['pending']} pending, lag {queue['lag_seconds']:.1f}s, "
+              f"{queue['inserted']} inserted, {queue['failed_batches']} failed flushes, {queue['dead']} rejected")
+    
+    slow = metrics.slow_queries()
+    print(f"\n🐢 Slow calls (>= {metrics.slow_threshold_ms()} ms): {len(slow)}")
+    for entry in slow[-10:]:
+        print(f"   {entry['at']} {entry['layer']} {entry['operation']} {entry['ms']} ms, {entry['rows']} rows")
+    
+    path = input("\nSave Prometheus text to file (Enter to skip): ").strip()
+    if path:
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(metrics.to_prometheus())
+            print(f"✅ Metrics written to {path}")
+        except OSError as e:
+            print(f"❌ Could not write metrics: {e}")
+
+def export_data_flow():
+    print("\n" + "="*50)
+    print("                 Export Data")
+    print("="*50)
+    
+    dataset = input(f"Dataset ({'/'.join(EXPORT_COLUMNS)}): ").strip().lower()
+    if dataset not in EXPORT_COLUMNS:
+        print("❌ Invalid dataset.")
+        return
+    
+    fmt = input(f"Format ({'/'.join(EXPORT_FORMATS)}) [csv]: ").strip().lower() or "csv"
+    if fmt not in EXPORT_FORMATS:
+        print("❌ Invalid format.")
+        return
+    
+    path = input("Output file (press Enter for the exports folder): ").strip() or None
+    
+    ok, res = ExportService().export_to_file(dataset, fmt, path)
+    if ok:
+        print(f"✅ Exported {res['rows']} rows to {res['path']}")
+    else:
+        print(f"❌ Export failed: {res}")
+
 def edit_questions_flow(user):
     while True:
         print("\n" + "="*50)
@@ -342,10 +451,12 @@ def edit_questions_flow(user):
         print("1. Add New Question")
         print("2. Modify Existing Question")
         print("3. Delete Question")
-        print("4. Back to Admin Menu")
+        print("4. Bulk Import Questions (CSV/JSON)")
+        print("5. Item Analytics")
+        print("6. Back to Admin Menu")
         print("-"*50)
         
-        ch = input("Choose option (1-4): ").strip()
+        ch = input("Choose option (1-6): ").strip()
         
         if ch == "1":
             add_question_flow(user)
@@ -354,9 +465,38 @@ def edit_questions_flow(user):
         elif ch == "3":
             delete_question_flow()
         elif ch == "4":
+            import_questions_flow(user)
+        elif ch == "5":
+            item_analytics_flow()
+        elif ch == "6":
             break
         else:
-            print("❌ Invalid choice. Please enter 1-4.")
+            print("❌ Invalid choice. Please enter 1-6.")
+
+def item_analytics_flow():
+    try:
+        subj_id = int(input("Subject ID: ").strip())
+    except ValueError:
+        print("❌ Invalid subject ID.")
+        return
+    
+    ok, report = admin_svc.get_item_analytics(subj_id)
+    if not ok:
+        print(f"❌ Error: {report}")
+        return
+    
+    print("\n" + "="*50)
+    print(f"          Item Analytics - Subject {subj_id}")
+    print("="*50)
+    fmt = lambda value: f"{value:.2f}" if value is not None else "N/A"
+    print(f"Responses: {report['responses']} | Mean p-value: {fmt(report['mean_p_value'])} | "
+          f"Mean discrimination: {fmt(report['mean_discrimination'])} | Flagged: {report['flagged']}")
+    print("-"*50)
+    print(f"{'QID':>6} {'key':>4} {'n':>7} {'p':>6} {'r_pb':>6}  {'A/B/C/D/-':<24} flags")
+    for item in report['items']:
+        counts = "/".join(str(item.option_counts.get(o, 0)) for o in "ABCD-")
+        print(f"{item.question_id:>6} {item.correct_option or '?':>4} {item.responses:>7} "
+              f"{fmt(item.p_value):>6} {fmt(item.discrimination):>6}  {counts:<24} {', '.join(item.flags)}")
 
 def add_question_flow(user):
     print("\n" + "="*50)
@@ -365,7 +505,7 @@ def add_question_flow(user):
     
     try:
         # Show available subjects
-        subjects = client.table("subjects").select("*").execute().data
+        subjects = SubjectDAO().get_all()
         if not subjects:
             print("❌ No subjects available. Please create subjects first.")
             return
@@ -413,6 +553,38 @@ def add_question_flow(user):
     except Exception as e:
         print(f"❌ Error adding question: {e}")
 
+def import_questions_flow(user):
+    print("\n" + "="*50)
+    print("            Bulk Import Questions")
+    print("="*50)
+    print("Columns: subject_id, question_text, option_a, option_b, option_c, option_d, correct_option")
+    print("-"*50)
+    
+    path = input("Path to .csv, .json or .jsonl file: ").strip()
+    if not path:
+        print("❌ A file path is required.")
+        return
+    
+    size = input("Batch size (press Enter for default): ").strip()
+    try:
+        batch_size = int(size) if size else None
+    except ValueError:
+        print("❌ Please enter a valid batch size (number).")
+        return
+    
+    ok, report = QuestionImportService().import_file(path, user['user_id'], batch_size)
+    if not ok:
+        print(f"❌ {report}")
+        return
+    
+    print(f"✅ Imported {report['imported']} of {report['total']} rows")
+    if report['failed']:
+        print(f"⚠️  {report['failed']} rows failed:")
+        for err in report['errors'][:20]:
+            print(f"   Row {err['row']}: {err['error']}")
+        if len(report['errors']) > 20:
+            print(f"   ... and {len(report['errors']) - 20} more")
+
 def modify_question_flow():
     print("\n" + "="*50)
     print("             Modify Question")
@@ -449,25 +621,27 @@ def delete_question_flow():
     print("="*50)
     
     try:
-        qid = int(input("Question ID to delete: ").strip())
+        qids = [int(part) for part in input("Question ID(s) to delete (comma-separated): ").split(",") if part.strip()]
+        if not qids:
+            print("❌ Please enter at least one question ID.")
+            return
         
         # Confirm deletion
-        confirm = input("Are you sure you want to delete this question? (y/N): ").strip().lower()
+        confirm = input(f"Are you sure you want to delete {len(qids)} question(s)? (y/N): ").strip().lower()
         if confirm != 'y':
             print("❌ Deletion cancelled.")
             return
         
-        from dao.question_dao import QuestionDAO
-        qdao = QuestionDAO()
-        result = qdao.delete(qid)
+        # One batch delete, however many IDs were given
+        deleted = admin_svc.delete_questions(qids)
         
-        if result:
-            print("✅ Question deleted successfully!")
+        if deleted:
+            print(f"✅ Deleted {len(deleted)} of {len(qids)} question(s).")
         else:
             print("❌ Failed to delete question. Check if question ID exists.")
             
     except ValueError:
-        print("❌ Please enter a valid question ID (number).")
+        print("❌ Please enter valid question IDs (numbers).")
     except Exception as e:
         print(f"❌ Error deleting question: {e}")
 
@@ -477,8 +651,9 @@ if __name__ == "__main__":
     # Test database connection
     try:
         # Simple test query
-        test = client.table('users').select('count', count='exact').execute()
+        test = get_client().table('users').select('user_id', count='exact').limit(1).execute()
         print("✅ Database connection successful!")
+        start_metrics_server()
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         print("💡 Please check your internet connection and .env file")
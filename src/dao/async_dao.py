@@ -0,0 +1,48 @@
+# src/dao/async_dao.py
+"""Asyncio counterparts of the DAOs.
+
+Each method of the wrapped DAO becomes a coroutine that runs the blocking
+call in a worker thread, so independent queries gathered with
+``asyncio.gather`` overlap on the shared connection pool instead of
+running back to back.
+"""
+import asyncio
+import functools
+from .attempt_dao import AttemptDAO
+from .question_dao import QuestionDAO
+from .subject_dao import SubjectDAO
+from .user_dao import UserDAO
+
+
+class _AsyncDAO:
+    dao_class = None
+
+    def __init__(self, dao=None):
+        self._dao = dao or self.dao_class()
+
+    def __getattr__(self, name):
+        method = getattr(self._dao, name)
+        if not callable(method):
+            return method
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return call
+
+
+class AsyncUserDAO(_AsyncDAO):
+    dao_class = UserDAO
+
+
+class AsyncQuestionDAO(_AsyncDAO):
+    dao_class = QuestionDAO
+
+
+class AsyncAttemptDAO(_AsyncDAO):
+    dao_class = AttemptDAO
+
+
+class AsyncSubjectDAO(_AsyncDAO):
+    dao_class = SubjectDAO
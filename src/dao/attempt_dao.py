@@ -1,21 +1,86 @@
-from .supabase_client import client
+from .db import get_client
+from .metrics import instrument_dao
+from .unit_of_work import invalidates, memoized
+from .pagination import iter_keyset
+from models.attempt import Attempt
 
+@instrument_dao
 class AttemptDAO:
+    @invalidates
     def create_attempt(self, user_id, subject_id, total_questions, correct_answers, score):
-        res = client.table("attempts").insert({
+        res = get_client().table("attempts").insert({
             "user_id": user_id,
             "subject_id": subject_id,
             "total_questions": total_questions,
             "correct_answers": correct_answers,
             "score": score
         }).execute()
-        return res.data[0] if res.data else None
+        return Attempt.from_row(res.data[0]) if res.data else None
 
+    @invalidates
+    def record_attempts(self, attempts):
+        """Store attempts together with their per-question answers, in one transaction.
+
+        Each item holds the attempt columns plus ``answers``: a list of
+        {question_id, chosen_option, is_correct}. Runs the record_attempts SQL
+        function (scripts/attempt_answers.sql); returns the attempts in order.
+        """
+        if not attempts:
+            return []
+        res = get_client().rpc("record_attempts", {"p_attempts": attempts}).execute()
+        return Attempt.from_rows(res.data)
+
+    def get_option_stats(self, question_ids, chunk_size=200):
+        # Per-(question, option) response count, score sum and squared-score sum,
+        # aggregated by the question_option_stats view; chunked to keep request URLs short
+        question_ids = list(question_ids)
+        rows = []
+        for start in range(0, len(question_ids), chunk_size):
+            res = get_client().table("question_option_stats") \
+                .select("question_id, chosen_option, responses, score_sum, score_squares") \
+                .in_("question_id", question_ids[start:start + chunk_size]).execute()
+            rows.extend(res.data or [])
+        return rows
+
+    @memoized
     def get_user_attempts(self, user_id):
-        res = client.table("attempts").select("*").eq("user_id", user_id).execute()
+        res = get_client().table("attempts").select(Attempt.columns()).eq("user_id", user_id).execute()
+        return Attempt.from_rows(res.data)
+
+    def get_scores_for_users(self, user_ids, chunk_size=200, page_size=1000):
+        # user_id and score of every attempt by these users; chunked to keep request URLs
+        # short and paged because PostgREST caps a single response at its max-rows setting
+        user_ids = list(user_ids)
+        rows = []
+        for start in range(0, len(user_ids), chunk_size):
+            rows.extend(iter_keyset("attempts", "attempt_id", "attempt_id, user_id, score", page_size,
+                                    filters=[("user_id", user_ids[start:start + chunk_size])]))
+        return rows
+
+    def iter_attempts(self, columns=Attempt.columns(), page_size=1000):
+        return iter_keyset("attempts", "attempt_id", columns, page_size)
+
+    @memoized
+    def get_top_attempts(self, limit, subject_id=None):
+        query = get_client().table("attempts").select(
+            "attempt_id, user_id, subject_id, score, correct_answers, total_questions, users(username), subjects(name)"
+        )
+        if subject_id is not None:
+            query = query.eq("subject_id", subject_id)
+        res = query.order("score", desc=True).order("attempt_id").limit(limit).execute()
         return res.data or []
 
+    @memoized
+    def get_total_attempts_count(self):
+        try:
+            res = get_client().table("attempts").select("attempt_id", count="exact").limit(1).execute()
+            return res.count if res.count is not None else len(res.data or [])
+        except Exception as e:
+            print(f"❌ Error getting total attempts count: {e}")
+            return 0
+
+    @memoized
     def get_active_status(self, subject_id):
         # If any attempt with finished_at is null, consider active
-        res = client.table("attempts").select("*").eq("subject_id", subject_id).is_("finished_at", None).execute()
+        res = get_client().table("attempts").select("attempt_id").eq("subject_id", subject_id).is_("finished_at", None).limit(1).execute()
         return bool(res.data)
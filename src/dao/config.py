@@ -0,0 +1,70 @@
+# src/dao/config.py
+import os
+import threading
+
+# Project root is two levels above src/dao
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+env_path = os.path.join(project_root, '.env')
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env():
+    # Deferred until the first setting is read, so importing a DAO does no file I/O
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if _env_loaded:
+            return
+        from dotenv import load_dotenv
+
+        print(f"🔍 Looking for .env at: {env_path}")
+        if os.path.exists(env_path):
+            load_dotenv(env_path)
+            print("✅ .env file loaded successfully")
+        else:
+            print("❌ .env file not found at expected location")
+            # Try loading from current directory as fallback
+            load_dotenv()
+        _env_loaded = True
+
+
+def get_setting(name, default=None):
+    load_env()
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def get_int_setting(name, default):
+    try:
+        return int(get_setting(name, default))
+    except (TypeError, ValueError):
+        print(f"❌ Invalid integer for {name}, using {default}")
+        return default
+
+
+def get_float_setting(name, default):
+    try:
+        return float(get_setting(name, default))
+    except (TypeError, ValueError):
+        print(f"❌ Invalid number for {name}, using {default}")
+        return default
+
+
+def get_bool_setting(name, default=False):
+    value = get_setting(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_backend():
+    # Storage backend: "supabase" (default) or "sqlite"
+    return get_setting("EDUQUIZ_BACKEND", "supabase").strip().lower()
+
+
+def get_sqlite_path():
+    return get_setting("SQLITE_PATH", os.path.join(project_root, "data", "eduquiz.db"))
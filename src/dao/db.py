@@ -0,0 +1,58 @@
+# src/dao/db.py
+# Selects the storage backend used by every DAO. Set EDUQUIZ_BACKEND=sqlite
+# (and optionally SQLITE_PATH) to run against a local database file instead
+# of Supabase; both expose the same client.table(...) query-builder API.
+#
+# The client is built on the first get_client() call rather than at import,
+# so importing DAOs and services stays free of I/O and configuration errors.
+import threading
+import time
+from .config import get_backend, get_bool_setting, get_sqlite_path
+from .metrics import InstrumentedClient
+
+_client = None
+_client_lock = threading.Lock()
+_init_seconds = None
+
+
+def _create_client():
+    backend = get_backend()
+    if backend == "sqlite":
+        from .sqlite_client import SQLiteClient
+
+        path = get_sqlite_path()
+        client = SQLiteClient(path)
+        print(f"✅ SQLite backend initialized at {path}")
+        return client
+    if backend == "supabase":
+        from .supabase_client import create_supabase_client
+
+        return create_supabase_client()
+    raise RuntimeError(f"❌ Unknown EDUQUIZ_BACKEND '{backend}' (expected 'supabase' or 'sqlite')")
+
+
+def get_client():
+    global _client, _init_seconds
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            started = time.perf_counter()
+            _client = _create_client()
+            if get_bool_setting("METRICS_ENABLED", True):
+                _client = InstrumentedClient(_client)
+            _init_seconds = time.perf_counter() - started
+            print(f"⏱️ Database client ready in {_init_seconds * 1000:.1f} ms")
+    return _client
+
+
+def get_client_init_seconds():
+    return _init_seconds
+
+
+def reset_client():
+    # Drops the cached client so the next get_client() rebuilds it from current settings
+    global _client, _init_seconds
+    with _client_lock:
+        _client = None
+        _init_seconds = None
@@ -0,0 +1,306 @@
+# src/dao/metrics.py
+"""Latency, row, payload and error metrics for DAO and backend calls.
+
+Every DAO method (``dao`` layer) and every query the backend client executes
+(``backend`` layer, labelled ``<table>.<action>``) is recorded here. Calls
+slower than SLOW_QUERY_MS are printed and kept in a short slow-query log.
+Metrics can be rendered in the Prometheus text format, served over HTTP
+when METRICS_PORT is set, or viewed from the CLI admin menu.
+"""
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from .config import get_bool_setting, get_int_setting
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_SLOW_LOG_SIZE = 100
+
+
+class OperationStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.payload_bytes = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+
+    def observe(self, seconds, rows, payload_bytes, error):
+        self.calls += 1
+        self.errors += int(error)
+        self.rows += rows
+        self.payload_bytes += payload_bytes
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        target = q * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max_seconds
+        return 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._ops = {}
+        self._slow = deque(maxlen=_SLOW_LOG_SIZE)
+        self._slow_ms = None
+        self._payload_bytes = None
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def add_gauges(self, name, help_text, snapshot):
+        # Extra gauges rendered from snapshot() -> {field: number}, e.g. a worker pool's state
+        with self._lock:
+            self._gauges[name] = (help_text, snapshot)
+
+    def slow_threshold_ms(self):
+        if self._slow_ms is None:
+            self._slow_ms = get_int_setting("SLOW_QUERY_MS", 500)
+        return self._slow_ms
+
+    def payload_bytes_enabled(self):
+        # Sizing a result means serializing it again, so it is off unless asked for
+        if self._payload_bytes is None:
+            self._payload_bytes = get_bool_setting("METRICS_PAYLOAD_BYTES", False)
+        return self._payload_bytes
+
+    def record(self, layer, operation, seconds, rows=0, payload_bytes=0, error=False, detail=None):
+        with self._lock:
+            stats = self._ops.get((layer, operation))
+            if stats is None:
+                stats = self._ops[(layer, operation)] = OperationStats()
+            stats.observe(seconds, rows, payload_bytes, error)
+        elapsed_ms = seconds * 1000
+        if elapsed_ms >= self.slow_threshold_ms():
+            entry = {
+                "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "layer": layer,
+                "operation": operation,
+                "ms": round(elapsed_ms, 1),
+                "rows": rows,
+                "detail": detail,
+            }
+            with self._lock:
+                self._slow.append(entry)
+            print(f"🐢 Slow {layer} call {operation}: {elapsed_ms:.0f} ms, {rows} rows{f' ({detail})' if detail else ''}")
+
+    def snapshot(self):
+        with self._lock:
+            rows = []
+            for (layer, operation), s in self._ops.items():
+                rows.append({
+                    "layer": layer,
+                    "operation": operation,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "rows": s.rows,
+                    "payload_bytes": s.payload_bytes,
+                    "total_ms": s.total_seconds * 1000,
+                    "avg_ms": s.total_seconds / s.calls * 1000 if s.calls else 0.0,
+                    "p50_ms": s.quantile(0.5) * 1000,
+                    "p95_ms": s.quantile(0.95) * 1000,
+                    "max_ms": s.max_seconds * 1000,
+                })
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def slow_queries(self):
+        with self._lock:
+            return list(self._slow)
+
+    def reset(self):
+        with self._lock:
+            self._ops.clear()
+            self._slow.clear()
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP eduquiz_operation_duration_seconds Latency of DAO methods and backend queries.",
+            "# TYPE eduquiz_operation_duration_seconds histogram",
+        ]
+        with self._lock:
+            ops = sorted(self._ops.items())
+            for (layer, operation), s in ops:
+                labels = f'layer="{layer}",operation="{operation}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, s.buckets):
+                    cumulative += count
+                    lines.append(f'eduquiz_operation_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'eduquiz_operation_duration_seconds_bucket{{{labels},le="+Inf"}} {s.calls}')
+                lines.append(f"eduquiz_operation_duration_seconds_sum{{{labels}}} {s.total_seconds}")
+                lines.append(f"eduquiz_operation_duration_seconds_count{{{labels}}} {s.calls}")
+            for name, help_text, attr in (
+                ("eduquiz_operation_errors_total", "Failed DAO methods and backend queries.", "errors"),
+                ("eduquiz_operation_rows_total", "Rows returned by DAO methods and backend queries.", "rows"),
+                ("eduquiz_operation_payload_bytes_total", "JSON size of backend query results (METRICS_PAYLOAD_BYTES).", "payload_bytes"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (layer, operation), s in ops:
+                    lines.append(f'{name}{{layer="{layer}",operation="{operation}"}} {getattr(s, attr)}')
+
+            gauges = list(self._gauges.items())
+
+        from .transport import get_pool_metrics
+        pool = get_pool_metrics()
+        if pool:
+            lines.append("# HELP eduquiz_http_pool Connection pool state of the Supabase HTTP client.")
+            lines.append("# TYPE eduquiz_http_pool gauge")
+            for key in ("pool_size", "in_flight", "peak_in_flight", "requests", "pool_timeouts", "avg_wait_ms"):
+                lines.append(f'eduquiz_http_pool{{field="{key}"}} {pool[key]}')
+        for name, (help_text, snapshot) in gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in snapshot().items():
+                lines.append(f'{name}{{field="{key}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _row_count(result):
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    # A single model row; counts, flags and iterators count as no rows
+    return 1 if hasattr(result, "field_names") else 0
+
+
+def instrument_dao(cls):
+    """Class decorator: time every public method of a DAO under the ``dao`` layer."""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(method):
+            continue
+        setattr(cls, name, _timed(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _timed(operation, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            registry.record("dao", operation, time.perf_counter() - started, error=True)
+            raise
+        registry.record("dao", operation, time.perf_counter() - started, rows=_row_count(result))
+        return result
+    return wrapper
+
+
+_ACTIONS = ("select", "insert", "upsert", "update", "delete")
+
+
+class InstrumentedQuery:
+    """Wraps a query builder so that ``execute()`` is recorded under the ``backend`` layer."""
+    __slots__ = ("_query", "_table", "_action")
+
+    def __init__(self, query, table, action="select"):
+        self._query = query
+        self._table = table
+        self._action = action
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name == "execute":
+            return self._execute
+        if not callable(attr):
+            return attr
+        action = name if name in _ACTIONS else self._action
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # Builders return themselves or a new builder; keep wrapping the chain
+            if hasattr(result, "execute"):
+                return InstrumentedQuery(result, self._table, action)
+            return result
+        return call
+
+    def _execute(self):
+        operation = f"{self._table}.{self._action}"
+        started = time.perf_counter()
+        try:
+            res = self._query.execute()
+        except Exception as e:
+            registry.record("backend", operation, time.perf_counter() - started, error=True, detail=str(e)[:200])
+            raise
+        elapsed = time.perf_counter() - started
+        data = getattr(res, "data", None)
+        rows = len(data) if isinstance(data, list) else int(data is not None)
+        payload = len(json.dumps(data, default=str)) if data and registry.payload_bytes_enabled() else 0
+        registry.record("backend", operation, elapsed, rows=rows, payload_bytes=payload)
+        return res
+
+
+class InstrumentedClient:
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return InstrumentedQuery(self._client.table(name), name)
+
+    def rpc(self, fn, params=None):
+        return InstrumentedQuery(self._client.rpc(fn, params or {}), fn, "rpc")
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def _metrics_handler():
+    # http.server is only imported when METRICS_PORT asks for a server, keeping it off the startup path
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+    return MetricsHandler
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server():
+    """Serve /metrics on METRICS_PORT (if set). Safe to call on every Streamlit rerun."""
+    global _server
+    port = get_int_setting("METRICS_PORT", 0)
+    if not port or _server is not None:
+        return _server or None
+    with _server_lock:
+        if _server is None:
+            from http.server import ThreadingHTTPServer
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", port), _metrics_handler())
+            except OSError as e:
+                print(f"❌ Could not start metrics server on port {port}: {e}")
+                _server = False  # don't retry on every rerun
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            print(f"✅ Prometheus metrics at http://0.0.0.0:{port}/metrics")
+    return _server
@@ -0,0 +1,24 @@
+# src/dao/pagination.py
+from .db import get_client
+
+
+def iter_keyset(table, key, columns="*", page_size=1000, filters=None):
+    """Yield every row of ``table`` ordered by ``key``, one page at a time.
+
+    Keyset pagination (``key > last_seen``) keeps each page an index range
+    scan, unlike OFFSET paging, and only one page is held in memory.
+    ``filters`` is an optional list of (column, value) equality filters; a
+    list or tuple value matches any of its items.
+    """
+    last = None
+    while True:
+        query = get_client().table(table).select(columns)
+        for column, value in filters or []:
+            query = query.in_(column, value) if isinstance(value, (list, tuple)) else query.eq(column, value)
+        if last is not None:
+            query = query.gt(key, last)
+        rows = query.order(key).limit(page_size).execute().data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last = rows[-1][key]
@@ -1,18 +1,74 @@
-from .supabase_client import client
+from .db import get_client
+from .metrics import instrument_dao
+from .unit_of_work import invalidates, memoized
+from .pagination import iter_keyset
+from .cache import TTLCache
+from .config import get_int_setting
+from models.question import Question
 
+# Shared by every QuestionDAO instance: the question bank changes rarely,
+# while many students start the same subject's quiz at once.
+# Built on first use so that settings are not read at import time.
+_question_cache = None
+# subject_id -> (question_id, correct_option) rows, used to grade submissions on the server
+_answer_cache = None
+
+def _cache():
+    global _question_cache
+    if _question_cache is None:
+        _question_cache = TTLCache(
+            maxsize=get_int_setting("QUESTION_CACHE_MAXSIZE", 256),
+            ttl=get_int_setting("QUESTION_CACHE_TTL", 300),
+        )
+    return _question_cache
+
+def _answers():
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = TTLCache(
+            maxsize=get_int_setting("QUESTION_CACHE_MAXSIZE", 256),
+            ttl=get_int_setting("QUESTION_CACHE_TTL", 300),
+        )
+    return _answer_cache
+
+@instrument_dao
 class QuestionDAO:
     def get_by_subject(self, subject_id):
+        cached = _cache().get(subject_id)
+        if cached is not None:
+            return list(cached)
         try:
-            res = client.table("questions").select("*").eq("subject_id", subject_id).execute()
-            return res.data or []
+            questions = Question.from_rows(iter_keyset("questions", "question_id", Question.columns(),
+                                                       filters=[("subject_id", subject_id)]))
+            _cache().set(subject_id, questions)
+            return list(questions)
         except Exception as e:
             print(f"❌ Error getting questions by subject: {e}")
             return []
 
+    def get_answer_rows(self, subject_id):
+        # The cached list itself is returned, so callers can tell when it was reloaded
+        def load():
+            # Paged: a subject may hold more questions than PostgREST returns at once
+            return Question.from_rows(iter_keyset("questions", "question_id", "question_id, correct_option",
+                                                  filters=[("subject_id", subject_id)]))
+        return _answers().get_or_load(subject_id, load)
+
+    def invalidate_subject(self, subject_id):
+        _cache().invalidate(subject_id)
+        _answers().invalidate(subject_id)
+
+    def clear_cache(self):
+        _cache().clear()
+        _answers().clear()
+
+    def cache_stats(self):
+        return _cache().stats()
+
+    @invalidates
     def create(self, question_data):
         try:
-            print(f"🔍 QuestionDAO: Inserting question: {question_data}")
-            res = client.table("questions").insert({
+            res = get_client().table("questions").insert({
                 "subject_id": question_data['subject_id'],
                 "question_text": question_data['question_text'],
                 "option_a": question_data['option_a'],
@@ -22,44 +78,77 @@ class QuestionDAO:
                 "correct_option": question_data['correct_option'],
                 "created_by": question_data['created_by']
             }).execute()
-            print(f"✅ QuestionDAO: Insert result: {res.data}")
-            return res.data[0] if res.data else None
+            self.invalidate_subject(question_data['subject_id'])
+            return Question.from_row(res.data[0]) if res.data else None
         except Exception as e:
             print(f"❌ Error creating question: {e}")
             return None
 
+    @invalidates
+    def create_many(self, rows):
+        # One insert for the whole batch; errors propagate so callers can isolate bad rows
+        res = get_client().table("questions").insert(rows).execute()
+        for subject_id in {row['subject_id'] for row in rows}:
+            self.invalidate_subject(subject_id)
+        return Question.from_rows(res.data)
+
+    @memoized
+    def get_by_id(self, question_id):
+        res = get_client().table("questions").select(Question.columns()).eq("question_id", question_id).execute()
+        return Question.from_row(res.data[0]) if res.data else None
+
+    @memoized
+    def get_by_ids(self, question_ids, chunk_size=200):
+        # Rows come back in the order of question_ids; chunked to keep request URLs short
+        question_ids = list(question_ids)
+        by_id = {}
+        for start in range(0, len(question_ids), chunk_size):
+            chunk = question_ids[start:start + chunk_size]
+            res = get_client().table("questions").select(Question.columns()).in_("question_id", chunk).execute()
+            for q in Question.from_rows(res.data):
+                by_id[q.question_id] = q
+        return [by_id[qid] for qid in question_ids if qid in by_id]
+
+    @memoized
+    def get_summaries(self):
+        # Just enough to label questions in admin pickers
+        res = get_client().table("questions").select("question_id, question_text, subject_id").execute()
+        return Question.from_rows(res.data)
+
+    @invalidates
     def update(self, question_id, fields):
         try:
-            # Try common primary key names
-            res = client.table("questions").update(fields).eq("question_id", question_id).execute()
-            if not res.data:
-                res = client.table("questions").update(fields).eq("id", question_id).execute()
-            return res.data[0] if res.data else None
+            old_subjects = self._moved_from([question_id], fields)
+            res = get_client().table("questions").update(fields).eq("question_id", question_id).execute()
+            self._invalidate_changed(res.data, old_subjects)
+            return Question.from_row(res.data[0]) if res.data else None
         except Exception as e:
             print(f"❌ Error updating question: {e}")
             return None
 
+    @invalidates
+    def update_many(self, question_ids, fields, chunk_size=200):
+        # Applies the same fields to every listed question; returns the updated rows
+        question_ids = list(question_ids)
+        old_subjects = self._moved_from(question_ids, fields, chunk_size)
+        rows = []
+        for start in range(0, len(question_ids), chunk_size):
+            res = get_client().table("questions").update(fields) \
+                .in_("question_id", question_ids[start:start + chunk_size]).execute()
+            rows.extend(res.data or [])
+        self._invalidate_changed(rows, old_subjects)
+        return Question.from_rows(rows)
+
+    @invalidates
     def delete(self, question_id):
         try:
-            print(f"🔍 QuestionDAO: Attempting to delete question with ID: {question_id}")
-            
-            # First try with question_id
-            res = client.table("questions").delete().eq("question_id", question_id).execute()
-            print(f"🔍 Delete attempt with question_id: {res}")
-            
-            if res.data and len(res.data) > 0:
-                print(f"✅ QuestionDAO: Deleted using question_id")
-                return res
-            
-            # If not found, try with id
-            res = client.table("questions").delete().eq("id", question_id).execute()
-            print(f"🔍 Delete attempt with id: {res}")
-            
-            if res.data and len(res.data) > 0:
-                print(f"✅ QuestionDAO: Deleted using id")
+            res = get_client().table("questions").delete().eq("question_id", question_id).execute()
+            if res.data:
+                print(f"✅ QuestionDAO: Deleted question {question_id}")
+                self._invalidate_deleted(res.data)
                 return res
             
-            print("❌ QuestionDAO: Question not found with either question_id or id")
+            print(f"❌ QuestionDAO: Question {question_id} not found")
             return None
             
         except Exception as e:
@@ -73,13 +162,48 @@ class QuestionDAO:
                 print(f"❌ Error details: {e.details}")
             return None
 
+    @invalidates
+    def delete_many(self, question_ids, chunk_size=200):
+        # Returns the deleted rows; ids that did not exist are simply absent
+        question_ids = list(question_ids)
+        rows = []
+        for start in range(0, len(question_ids), chunk_size):
+            res = get_client().table("questions").delete().in_("question_id", question_ids[start:start + chunk_size]).execute()
+            rows.extend(res.data or [])
+        self._invalidate_deleted(rows)
+        return Question.from_rows(rows)
+
+    def _moved_from(self, question_ids, fields, chunk_size=200):
+        # Subjects the questions are in before an update that moves them; only
+        # then does the old subject's cache need invalidating as well
+        if "subject_id" not in fields:
+            return set()
+        subjects = set()
+        for start in range(0, len(question_ids), chunk_size):
+            res = get_client().table("questions").select("subject_id") \
+                .in_("question_id", question_ids[start:start + chunk_size]).execute()
+            subjects.update(row["subject_id"] for row in res.data or [])
+        return subjects
+
+    def _invalidate_changed(self, rows, old_subjects=()):
+        for subject_id in set(old_subjects) | {row.get("subject_id") for row in rows or []}:
+            self.invalidate_subject(subject_id)
+
+    def _invalidate_deleted(self, rows):
+        for subject_id in {row.get("subject_id") for row in rows}:
+            self.invalidate_subject(subject_id)
+
     # ADD THIS METHOD TO GET TOTAL QUESTIONS COUNT
+    @memoized
     def get_total_questions_count(self):
         try:
-            res = client.table("questions").select("question_id", count="exact").execute()
+            res = get_client().table("questions").select("question_id", count="exact").limit(1).execute()
             count = res.count if hasattr(res, 'count') else len(res.data) if res.data else 0
             print(f"✅ Total questions count: {count}")
             return count
         except Exception as e:
             print(f"❌ Error getting total questions count: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+    def iter_questions(self, columns=Question.columns(), page_size=1000):
+        return iter_keyset("questions", "question_id", columns, page_size)
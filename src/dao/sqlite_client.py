@@ -0,0 +1,589 @@
+# src/dao/sqlite_client.py
+"""Embedded SQLite storage backend.
+
+Implements the subset of the supabase-py query builder the DAOs rely on
+(``client.table(...).select/insert/upsert/update/delete(...)`` with eq/neq/gt/gte/
+lt/lte/is_/in_/or_ filters, order, limit, range, ``count="exact"`` and
+many-to-one embeds such as ``users(username)``), plus ``client.rpc(...)`` for
+the SQL functions in FUNCTIONS, so every DAO runs unchanged against a local
+database file.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from .unit_of_work import record_query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('student', 'admin')),
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS subjects (
+    subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS questions (
+    question_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_id INTEGER NOT NULL REFERENCES subjects (subject_id),
+    question_text TEXT NOT NULL,
+    option_a TEXT NOT NULL,
+    option_b TEXT NOT NULL,
+    option_c TEXT,
+    option_d TEXT,
+    correct_option TEXT NOT NULL CHECK (correct_option IN ('A', 'B', 'C', 'D')),
+    created_by INTEGER REFERENCES users (user_id),
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS questions_subject_id_idx ON questions (subject_id);
+
+CREATE TABLE IF NOT EXISTS attempts (
+    attempt_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    subject_id INTEGER NOT NULL REFERENCES subjects (subject_id),
+    total_questions INTEGER NOT NULL,
+    correct_answers INTEGER NOT NULL,
+    score REAL NOT NULL,
+    started_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_user_id_idx ON attempts (user_id);
+CREATE INDEX IF NOT EXISTS attempts_subject_id_idx ON attempts (subject_id);
+CREATE INDEX IF NOT EXISTS attempts_score_idx ON attempts (score);
+
+CREATE TABLE IF NOT EXISTS attempt_answers (
+    answer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    attempt_id INTEGER NOT NULL REFERENCES attempts (attempt_id) ON DELETE CASCADE,
+    question_id INTEGER NOT NULL REFERENCES questions (question_id) ON DELETE CASCADE,
+    chosen_option TEXT CHECK (chosen_option IN ('A', 'B', 'C', 'D')),
+    is_correct INTEGER NOT NULL,
+    UNIQUE (attempt_id, question_id)
+);
+CREATE INDEX IF NOT EXISTS attempt_answers_question_id_idx ON attempt_answers (question_id, is_correct);
+CREATE VIEW IF NOT EXISTS question_option_stats AS
+    SELECT aa.question_id, aa.chosen_option, COUNT(*) AS responses,
+           SUM(a.score) AS score_sum, SUM(a.score * a.score) AS score_squares
+    FROM attempt_answers aa JOIN attempts a ON a.attempt_id = aa.attempt_id
+    GROUP BY aa.question_id, aa.chosen_option;
+
+CREATE TABLE IF NOT EXISTS student_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users (user_id),
+    attempt_count INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    best_score REAL,
+    last_attempt_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS student_subject_stats (
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    subject_id INTEGER NOT NULL REFERENCES subjects (subject_id),
+    attempt_count INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    best_score REAL,
+    last_attempt_at TEXT,
+    PRIMARY KEY (user_id, subject_id)
+);
+"""
+
+# Local equivalents of the SQL functions the DAOs call through rpc(); each runs
+# as one transaction, like a Postgres function. Entries are statement lists
+# (parameters bind by name) or callables building (sql, params) pairs.
+_FOLD_ATTEMPT = """
+    attempt_count = attempt_count + 1,
+    score_sum = score_sum + excluded.score_sum,
+    best_score = max(coalesce(best_score, excluded.best_score), excluded.best_score),
+    last_attempt_at = max(coalesce(last_attempt_at, excluded.last_attempt_at),
+                          coalesce(excluded.last_attempt_at, last_attempt_at))
+"""
+
+_INSERT_ATTEMPT = (
+    "INSERT INTO attempts (user_id, subject_id, total_questions, correct_answers, score, started_at) "
+    "VALUES (:user_id, :subject_id, :total_questions, :correct_answers, :score, "
+    "coalesce(:started_at, strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))) RETURNING *"
+)
+# Answers of the attempt just inserted; questions deleted since grading are skipped
+_INSERT_ANSWERS = (
+    "INSERT INTO attempt_answers (attempt_id, question_id, chosen_option, is_correct) "
+    "SELECT (SELECT MAX(attempt_id) FROM attempts), json_extract(value, '$.question_id'), "
+    "json_extract(value, '$.chosen_option'), json_extract(value, '$.is_correct') "
+    "FROM json_each(:answers) "
+    "WHERE json_extract(value, '$.question_id') IN (SELECT question_id FROM questions)"
+)
+
+
+def _record_attempts(params):
+    statements = []
+    for item in params["p_attempts"]:
+        values = {key: item.get(key) for key in
+                  ("user_id", "subject_id", "total_questions", "correct_answers", "score", "started_at")}
+        statements.append((_INSERT_ATTEMPT, values))
+        statements.append((_INSERT_ANSWERS, {"answers": json.dumps(item.get("answers") or [])}))
+    return statements
+
+
+FUNCTIONS = {
+    "record_attempts": _record_attempts,
+    "record_student_attempt": [
+        "INSERT INTO student_stats (user_id, attempt_count, score_sum, best_score, last_attempt_at) "
+        "VALUES (:p_user_id, 1, :p_score, :p_score, :p_attempted_at) "
+        "ON CONFLICT (user_id) DO UPDATE SET" + _FOLD_ATTEMPT,
+        "INSERT INTO student_subject_stats (user_id, subject_id, attempt_count, score_sum, best_score, last_attempt_at) "
+        "VALUES (:p_user_id, :p_subject_id, 1, :p_score, :p_score, :p_attempted_at) "
+        "ON CONFLICT (user_id, subject_id) DO UPDATE SET" + _FOLD_ATTEMPT,
+    ],
+    "rebuild_student_stats": [
+        "DELETE FROM student_subject_stats",
+        "DELETE FROM student_stats",
+        "INSERT INTO student_stats (user_id, attempt_count, score_sum, best_score, last_attempt_at) "
+        "SELECT user_id, COUNT(*), SUM(score), MAX(score), MAX(started_at) FROM attempts GROUP BY user_id",
+        "INSERT INTO student_subject_stats (user_id, subject_id, attempt_count, score_sum, best_score, last_attempt_at) "
+        "SELECT user_id, subject_id, COUNT(*), SUM(score), MAX(score), MAX(started_at) "
+        "FROM attempts GROUP BY user_id, subject_id",
+        "SELECT (SELECT COUNT(*) FROM student_stats) AS students, "
+        "(SELECT COUNT(*) FROM student_subject_stats) AS pairs",
+    ],
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_EMBED = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)\((.*)\)$")
+
+
+class SQLiteAPIError(Exception):
+    """Mirrors the fields of postgrest's APIError so callers can treat both backends alike."""
+
+    def __init__(self, message, code=None, details=None, hint=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.details = details
+        self.hint = hint
+
+
+class APIResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self):
+        return f"data={self.data!r} count={self.count!r}"
+
+
+def _ident(name):
+    if not _IDENTIFIER.match(name or ""):
+        raise SQLiteAPIError(f"Invalid identifier: {name!r}", code="42602")
+    return name
+
+
+def _split_columns(columns):
+    # Split on top-level commas only, so "users(username, email)" stays intact
+    parts, depth, current = [], 0, ""
+    for ch in columns:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+_COMPARISONS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _split_conditions(filters):
+    # Split a PostgREST logic string on top-level commas; "double-quoted" values may contain commas
+    parts, current, quoted, escaped = [], "", False, False
+    for ch in filters:
+        if escaped:
+            current += ch
+            escaped = False
+        elif ch == "\\" and quoted:
+            current += ch
+            escaped = True
+        elif ch == '"':
+            current += ch
+            quoted = not quoted
+        elif ch == "," and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+
+def _translate_error(exc):
+    msg = str(exc)
+    if isinstance(exc, sqlite3.IntegrityError):
+        if msg.startswith("UNIQUE constraint failed:"):
+            qualified = [c.strip() for c in msg.split(":", 1)[1].split(",")]
+            table = qualified[0].split(".", 1)[0]
+            cols = [c.split(".", 1)[1] for c in qualified]
+            return SQLiteAPIError(
+                f'duplicate key value violates unique constraint "{table}_{"_".join(cols)}_key"',
+                code="23505",
+                details=f"Key ({', '.join(cols)}) already exists.",
+            )
+        if "FOREIGN KEY" in msg:
+            return SQLiteAPIError(msg, code="23503")
+        if "NOT NULL" in msg:
+            return SQLiteAPIError(msg, code="23502")
+        if "CHECK" in msg:
+            return SQLiteAPIError(msg, code="23514")
+    if "no such column" in msg or "has no column named" in msg:
+        return SQLiteAPIError(msg, code="42703")
+    if "no such table" in msg:
+        return SQLiteAPIError(msg, code="42P01")
+    return SQLiteAPIError(msg)
+
+
+class SQLiteClient:
+    def __init__(self, path):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # One connection shared by all threads; statements are serialized here
+        self._lock = threading.RLock()
+        self._columns = {}
+        self._primary_keys = {}
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    def table(self, name):
+        return SQLiteQueryBuilder(self, _ident(name))
+
+    def rpc(self, fn, params=None):
+        if fn not in FUNCTIONS:
+            raise SQLiteAPIError(f"Could not find the function {fn}", code="PGRST202")
+        return SQLiteRPC(self, fn, params or {})
+
+    def columns(self, table):
+        if table not in self._columns:
+            info = self.run(f'PRAGMA table_info("{_ident(table)}")')
+            if not info:
+                raise SQLiteAPIError(f'relation "{table}" does not exist', code="42P01")
+            self._columns[table] = [row["name"] for row in info]
+            pk = [row["name"] for row in sorted(info, key=lambda r: r["pk"]) if row["pk"]]
+            self._primary_keys[table] = pk
+        return self._columns[table]
+
+    def primary_key(self, table):
+        # First primary-key column; composite keys are only needed for upsert
+        return (self.primary_key_columns(table) or [None])[0]
+
+    def primary_key_columns(self, table):
+        self.columns(table)
+        return self._primary_keys[table]
+
+    def run(self, sql, params=(), write=False):
+        record_query()
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+                if write:
+                    self._conn.commit()
+                return rows
+            except sqlite3.Error as e:
+                if write:
+                    self._conn.rollback()
+                raise _translate_error(e) from e
+
+    def run_many(self, statements):
+        # Executes (sql, params) pairs in one transaction and returns every RETURNING row
+        record_query()
+        with self._lock:
+            try:
+                rows = []
+                for sql, params in statements:
+                    rows.extend(self._conn.execute(sql, params).fetchall())
+                self._conn.commit()
+                return rows
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                raise _translate_error(e) from e
+
+
+class SQLiteRPC:
+    def __init__(self, client, fn, params):
+        self._client = client
+        self._fn = fn
+        self._params = params
+
+    def execute(self):
+        function = FUNCTIONS[self._fn]
+        if callable(function):
+            statements = function(self._params)
+        else:
+            statements = [(sql, self._params) for sql in function]
+        rows = self._client.run_many(statements)
+        return APIResponse([dict(row) for row in rows])
+
+
+class SQLiteQueryBuilder:
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._action = None
+        self._columns = "*"
+        self._count = None
+        self._payload = None
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    # --- actions ---
+
+    def select(self, *columns, count=None):
+        self._action = "select"
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        return self
+
+    def insert(self, json):
+        self._action = "insert"
+        self._payload = json if isinstance(json, list) else [json]
+        return self
+
+    def upsert(self, json, on_conflict="", ignore_duplicates=False):
+        self._action = "upsert"
+        self._payload = json if isinstance(json, list) else [json]
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json):
+        self._action = "update"
+        self._payload = json
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    # --- filters and modifiers ---
+
+    def _filter(self, column, op, value):
+        self._filters.append((f'"{self._table}"."{_ident(column)}" {op} ?', [value]))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "=", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "!=", value)
+
+    def gt(self, column, value):
+        return self._filter(column, ">", value)
+
+    def gte(self, column, value):
+        return self._filter(column, ">=", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "<", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "<=", value)
+
+    def is_(self, column, value):
+        column = f'"{self._table}"."{_ident(column)}"'
+        if value is None or str(value).lower() == "null":
+            self._filters.append((f"{column} IS NULL", []))
+        else:
+            self._filters.append((f"{column} IS ?", [1 if str(value).lower() == "true" else 0]))
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        if not values:
+            self._filters.append(("0", []))
+            return self
+        placeholders = ", ".join("?" for _ in values)
+        self._filters.append((f'"{self._table}"."{_ident(column)}" IN ({placeholders})', values))
+        return self
+
+    def or_(self, filters):
+        # PostgREST logic string, e.g. 'username.eq."bob",email.eq."bob@example.com"'
+        clauses, params = [], []
+        for condition in _split_conditions(filters):
+            try:
+                column, op, value = condition.split(".", 2)
+            except ValueError:
+                raise SQLiteAPIError(f'"failed to parse logic tree (({filters}))"', code="PGRST100")
+            column = f'"{self._table}"."{_ident(column.strip())}"'
+            if op == "is":
+                clauses.append(f"{column} IS NULL" if value.lower() == "null" else f"{column} IS ?")
+                if value.lower() != "null":
+                    params.append(1 if value.lower() == "true" else 0)
+            elif op in _COMPARISONS:
+                clauses.append(f"{column} {_COMPARISONS[op]} ?")
+                params.append(_unquote(value))
+            else:
+                raise SQLiteAPIError(f"Unsupported operator in or_: {op}", code="PGRST100")
+        self._filters.append(("(" + " OR ".join(clauses) + ")", params))
+        return self
+
+    def order(self, column, desc=False):
+        self._order.append(f'"{self._table}"."{_ident(column)}" {"DESC" if desc else "ASC"}')
+        return self
+
+    def limit(self, size):
+        self._limit = int(size)
+        return self
+
+    def range(self, start, end):
+        self._offset = int(start)
+        self._limit = int(end) - int(start) + 1
+        return self
+
+    # --- execution ---
+
+    def _where(self):
+        if not self._filters:
+            return "", []
+        params = []
+        for _, values in self._filters:
+            params.extend(values)
+        return " WHERE " + " AND ".join(sql for sql, _ in self._filters), params
+
+    def execute(self):
+        if self._action == "select":
+            return self._execute_select()
+        if self._action == "insert":
+            return self._execute_insert()
+        if self._action == "upsert":
+            return self._execute_insert(upsert=True)
+        if self._action == "update":
+            return self._execute_update()
+        if self._action == "delete":
+            return self._execute_delete()
+        raise SQLiteAPIError("No action (select/insert/upsert/update/delete) specified")
+
+    def _execute_select(self):
+        table = self._table
+        columns, embeds = [], []
+        for part in _split_columns(self._columns):
+            embed = _EMBED.match(part)
+            if embed:
+                embeds.append((_ident(embed.group(1)), embed.group(2).strip() or "*"))
+            elif part == "*":
+                columns.extend(self._client.columns(table))
+            else:
+                columns.append(_ident(part))
+
+        select_parts = [f'"{table}"."{c}" AS "{c}"' for c in columns]
+        joins = []
+        for i, (embed_table, embed_columns) in enumerate(embeds):
+            # Many-to-one embed: the embedded table's primary key is a column of this table
+            fk = self._client.primary_key(embed_table)
+            if fk not in self._client.columns(table):
+                raise SQLiteAPIError(
+                    f"Could not find a relationship between '{table}' and '{embed_table}'",
+                    code="PGRST200",
+                )
+            alias = f"e{i}"
+            joins.append(f'LEFT JOIN "{embed_table}" AS {alias} ON {alias}."{fk}" = "{table}"."{fk}"')
+            select_parts.append(f'{alias}."{fk}" AS "__{embed_table}"')
+            wanted = [c.strip() for c in _split_columns(embed_columns)]
+            if "*" in wanted:
+                wanted = self._client.columns(embed_table)
+            for c in wanted:
+                select_parts.append(f'{alias}."{_ident(c)}" AS "{embed_table}.{c}"')
+
+        where, params = self._where()
+        sql = f'SELECT {", ".join(select_parts) or "1"} FROM "{table}" {" ".join(joins)}{where}'
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        if self._limit is not None or self._offset is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [self._limit if self._limit is not None else -1, self._offset or 0]
+
+        data = []
+        for row in self._client.run(sql, params):
+            item = {}
+            for key in row.keys():
+                if key.startswith("__"):
+                    continue
+                if "." in key:
+                    embed_table, column = key.split(".", 1)
+                    if row[f"__{embed_table}"] is None:
+                        item[embed_table] = None
+                    else:
+                        item.setdefault(embed_table, {})[column] = row[key]
+                else:
+                    item[key] = row[key]
+            data.append(item)
+
+        count = None
+        if self._count:
+            count_params = self._where()[1]
+            count = self._client.run(f'SELECT COUNT(*) FROM "{table}"{where}', count_params)[0][0]
+        return APIResponse(data, count)
+
+    def _execute_insert(self, upsert=False):
+        conflict = []
+        if upsert:
+            # Like PostgREST, conflicts are resolved on the primary key unless on_conflict names columns
+            conflict = [_ident(c.strip()) for c in self._on_conflict.split(",") if c.strip()] \
+                or self._client.primary_key_columns(self._table)
+        statements = []
+        for row in self._payload:
+            cols = [_ident(c) for c in row]
+            col_sql = ", ".join(f'"{c}"' for c in cols)
+            placeholders = ", ".join("?" for _ in cols)
+            if cols:
+                sql = f'INSERT INTO "{self._table}" ({col_sql}) VALUES ({placeholders})'
+            else:
+                sql = f'INSERT INTO "{self._table}" DEFAULT VALUES'
+            if conflict:
+                target = ", ".join(f'"{c}"' for c in conflict)
+                updates = [c for c in cols if c not in conflict]
+                if self._ignore_duplicates or not updates:
+                    sql += f" ON CONFLICT ({target}) DO NOTHING"
+                else:
+                    set_sql = ", ".join(f'"{c}" = excluded."{c}"' for c in updates)
+                    sql += f" ON CONFLICT ({target}) DO UPDATE SET {set_sql}"
+            statements.append((sql + " RETURNING *", [row[c] for c in cols]))
+        rows = self._client.run_many(statements)
+        data = [dict(r) for r in rows]
+        return APIResponse(data, len(data) if self._count else None)
+
+    def _execute_update(self):
+        cols = [_ident(c) for c in self._payload]
+        if not cols:
+            return APIResponse([])
+        set_sql = ", ".join(f'"{c}" = ?' for c in cols)
+        where, params = self._where()
+        sql = f'UPDATE "{self._table}" SET {set_sql}{where} RETURNING *'
+        rows = self._client.run(sql, [self._payload[c] for c in cols] + params, write=True)
+        return APIResponse([dict(r) for r in rows])
+
+    def _execute_delete(self):
+        where, params = self._where()
+        rows = self._client.run(f'DELETE FROM "{self._table}"{where} RETURNING *', params, write=True)
+        return APIResponse([dict(r) for r in rows])
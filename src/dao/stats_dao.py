@@ -0,0 +1,49 @@
+from .db import get_client
+from .metrics import instrument_dao
+from .unit_of_work import invalidates, memoized
+from .pagination import iter_keyset
+from models.stats import StudentStats, StudentSubjectStats
+
+@instrument_dao
+class StatsDAO:
+    """Per-student and per-(student, subject) attempt rollups.
+
+    Kept up to date as attempts are recorded, so dashboards and admin
+    statistics read one row per student instead of scanning attempts.
+    """
+
+    @memoized
+    def get_student(self, user_id):
+        res = get_client().table("student_stats").select(StudentStats.columns()).eq("user_id", user_id).execute()
+        return StudentStats.from_row(res.data[0]) if res.data else None
+
+    @memoized
+    def get_student_subjects(self, user_id):
+        res = get_client().table("student_subject_stats").select(StudentSubjectStats.columns()) \
+            .eq("user_id", user_id).execute()
+        return StudentSubjectStats.from_rows(res.data)
+
+    @memoized
+    def get_all_students(self, page_size=1000):
+        return StudentStats.from_rows(iter_keyset("student_stats", "user_id", StudentStats.columns(), page_size))
+
+    @invalidates
+    def record_attempt(self, user_id, subject_id, score, attempted_at=None):
+        # One server-side upsert per rollup row (scripts/student_stats.sql), so
+        # concurrent submits add up instead of overwriting each other
+        get_client().rpc("record_student_attempt", {
+            "p_user_id": user_id,
+            "p_subject_id": subject_id,
+            "p_score": score,
+            "p_attempted_at": attempted_at,
+        }).execute()
+
+    @invalidates
+    def rebuild(self):
+        """Recompute every rollup from the attempts table. Returns (students, student_subject pairs)."""
+        # One transaction on the server; concurrent submits wait for it rather than interleave
+        res = get_client().rpc("rebuild_student_stats", {}).execute()
+        row = res.data[0] if isinstance(res.data, list) else res.data
+        students, pairs = int(row["students"]), int(row["pairs"])
+        print(f"✅ Rebuilt stats for {students} students ({pairs} student/subject pairs)")
+        return students, pairs
@@ -0,0 +1,48 @@
+from .db import get_client
+from .metrics import instrument_dao
+from .cache import TTLCache
+from .config import get_int_setting
+from models.subject import Subject
+
+# Single process-wide catalog entry holding (subjects, {subject_id: subject}),
+# built on first use so that settings are not read at import time
+_subject_catalog = None
+_CATALOG_KEY = "subjects"
+
+def _cache():
+    global _subject_catalog
+    if _subject_catalog is None:
+        _subject_catalog = TTLCache(maxsize=1, ttl=get_int_setting("SUBJECT_CACHE_TTL", 600))
+    return _subject_catalog
+
+@instrument_dao
+class SubjectDAO:
+    def _catalog(self):
+        cached = _cache().get(_CATALOG_KEY)
+        if cached is not None:
+            return cached
+        try:
+            res = get_client().table("subjects").select(Subject.columns()).order("subject_id").execute()
+            subjects = Subject.from_rows(res.data)
+            print(f"✅ Loaded {len(subjects)} subjects into catalog")
+            catalog = (subjects, {s['subject_id']: s for s in subjects})
+            _cache().set(_CATALOG_KEY, catalog)
+            return catalog
+        except Exception as e:
+            print(f"❌ Error loading subjects: {e}")
+            return [], {}
+
+    def get_all(self):
+        return list(self._catalog()[0])
+
+    def get_by_id(self, subject_id):
+        return self._catalog()[1].get(subject_id)
+
+    def get_count(self):
+        return len(self._catalog()[0])
+
+    def invalidate(self):
+        _cache().clear()
+
+    def cache_stats(self):
+        return _cache().stats()
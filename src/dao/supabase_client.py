@@ -1,36 +1,28 @@
 # src/dao/supabase_client.py
-import os
-import sys
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from .config import get_setting
+from .transport import build_http_client
 
-# Load .env from project root
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(current_dir))
-env_path = os.path.join(project_root, '.env')
 
-print(f"🔍 Looking for .env at: {env_path}")
+def create_supabase_client():
+    # Imported here: the supabase package is heavy and only needed by this backend
+    from supabase import ClientOptions, create_client
 
-if os.path.exists(env_path):
-    load_dotenv(env_path)
-    print("✅ .env file loaded successfully")
-else:
-    print("❌ .env file not found at expected location")
-    # Try loading from current directory as fallback
-    load_dotenv()
+    supabase_url = get_setting("SUPABASE_URL")
+    supabase_key = get_setting("SUPABASE_KEY")
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+    print(f"🔍 Supabase URL: {supabase_url}")
+    print(f"🔍 Supabase Key: {'*' * 20 if supabase_key else 'NOT FOUND'}")
 
-print(f"🔍 Supabase URL: {SUPABASE_URL}")
-print(f"🔍 Supabase Key: {'*' * 20 if SUPABASE_KEY else 'NOT FOUND'}")
+    if not supabase_url or not supabase_key:
+        raise RuntimeError("❌ SUPABASE_URL and SUPABASE_KEY must be set in .env file")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("❌ SUPABASE_URL and SUPABASE_KEY must be set in .env file")
-
-try:
-    client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("✅ Supabase client initialized successfully")
-except Exception as e:
-    print(f"❌ Failed to initialize Supabase client: {e}")
-    client = None
\ No newline at end of file
+    try:
+        # The shared pooled client is handed to PostgREST, which points its
+        # base_url at the REST endpoint; the DAO layer only talks to PostgREST
+        options = ClientOptions(httpx_client=build_http_client())
+        client = create_client(supabase_url, supabase_key, options=options)
+        print("✅ Supabase client initialized successfully")
+        return client
+    except Exception as e:
+        print(f"❌ Failed to initialize Supabase client: {e}")
+        raise
@@ -0,0 +1,142 @@
+# src/dao/transport.py
+"""Pooled, keep-alive HTTP transport for the Supabase backend.
+
+One ``httpx.Client`` is shared by every DAO and every Streamlit session
+thread, so TLS connections are reused instead of re-established per call.
+Concurrency is bounded by the pool size, and the time requests spend
+waiting for a free connection is recorded in ``get_pool_metrics()``.
+"""
+import threading
+import time
+import httpx
+from .config import get_bool_setting, get_float_setting, get_int_setting
+from .unit_of_work import record_query
+
+
+class PoolMetrics:
+    def __init__(self, pool_size):
+        self.pool_size = pool_size
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.waited_requests = 0
+        self.pool_timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def acquired(self, waited):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if waited > 0.001:
+                self.waited_requests += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def released(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def timed_out(self):
+        with self._lock:
+            self.pool_timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "in_flight": self.in_flight,
+                "utilization": self.in_flight / self.pool_size if self.pool_size else 0.0,
+                "peak_in_flight": self.peak_in_flight,
+                "requests": self.requests,
+                "waited_requests": self.waited_requests,
+                "pool_timeouts": self.pool_timeouts,
+                "avg_wait_ms": self.total_wait_seconds / self.requests * 1000 if self.requests else 0.0,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+            }
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    # The connection stays checked out until the response body is closed
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class PooledTransport(httpx.HTTPTransport):
+    def __init__(self, pool_size, pool_timeout, metrics, **kwargs):
+        super().__init__(**kwargs)
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._pool_timeout = pool_timeout
+        self._metrics = metrics
+
+    def handle_request(self, request):
+        record_query()
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self._pool_timeout):
+            self._metrics.timed_out()
+            raise httpx.PoolTimeout(f"No free connection within {self._pool_timeout}s", request=request)
+        self._metrics.acquired(time.perf_counter() - started)
+
+        released = threading.Event()
+
+        def release():
+            if not released.is_set():
+                released.set()
+                self._slots.release()
+                self._metrics.released()
+
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            release()
+            raise
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+
+_metrics = None
+
+
+def build_http_client():
+    global _metrics
+    pool_size = get_int_setting("HTTP_POOL_SIZE", 20)
+    keepalive = get_float_setting("HTTP_KEEPALIVE_SECONDS", 30.0)
+    timeout = get_float_setting("HTTP_TIMEOUT_SECONDS", 10.0)
+    pool_timeout = get_float_setting("HTTP_POOL_TIMEOUT_SECONDS", 5.0)
+    http2 = get_bool_setting("HTTP2", False)
+
+    _metrics = PoolMetrics(pool_size)
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=keepalive,
+    )
+    try:
+        transport = PooledTransport(pool_size, pool_timeout, _metrics, limits=limits, http2=http2)
+    except ImportError:
+        print("❌ HTTP2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+        http2 = False
+        transport = PooledTransport(pool_size, pool_timeout, _metrics, limits=limits)
+
+    print(f"✅ HTTP pool ready (size={pool_size}, keep-alive={keepalive}s, http2={http2}, timeout={timeout}s)")
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(timeout, pool=pool_timeout),
+        follow_redirects=True,
+    )
+
+
+def get_pool_metrics():
+    return _metrics.snapshot() if _metrics else None
@@ -0,0 +1,97 @@
+# src/dao/unit_of_work.py
+"""Request-scoped memoization of DAO reads.
+
+Inside ``request_scope()`` (one Streamlit script run, one CLI action),
+identical DAO reads hit the backend once; any DAO write clears the scope's
+memo so later reads see it. Outside a scope DAOs behave exactly as before.
+The scope also counts the backend queries actually issued, for debugging.
+"""
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("eduquiz_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    def __init__(self, name=None):
+        self.name = name
+        self.queries = 0
+        self.hits = 0
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key, loader):
+        with self._lock:
+            if key in self._memo:
+                self.hits += 1
+                return self._memo[key]
+        value = loader()
+        with self._lock:
+            self._memo[key] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+    def record_query(self):
+        with self._lock:
+            self.queries += 1
+
+    def stats(self):
+        with self._lock:
+            return {"name": self.name, "queries": self.queries, "memo_hits": self.hits, "memo_size": len(self._memo)}
+
+
+@contextmanager
+def request_scope(name=None):
+    unit = UnitOfWork(name)
+    token = _current.set(unit)
+    try:
+        yield unit
+    finally:
+        _current.reset(token)
+
+
+def current_unit():
+    return _current.get()
+
+
+def record_query():
+    # Called by the backends for every statement or HTTP request they issue
+    unit = _current.get()
+    if unit is not None:
+        unit.record_query()
+
+
+def memoized(method):
+    """Memoize a DAO read for the rest of the current request scope."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        unit = _current.get()
+        if unit is None:
+            return method(self, *args, **kwargs)
+        key = (method.__qualname__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        value = unit.lookup(key, lambda: method(self, *args, **kwargs))
+        # Callers may mutate the lists they get back
+        return list(value) if isinstance(value, list) else value
+    return wrapper
+
+
+def invalidates(method):
+    """Clear the current scope's memo after a DAO write."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            unit = _current.get()
+            if unit is not None:
+                unit.clear()
+    return wrapper
@@ -1,36 +1,75 @@
-from .supabase_client import client
+from .db import get_client
+from .metrics import instrument_dao
+from .unit_of_work import invalidates, memoized
+from .pagination import iter_keyset
+from models.user import User
 
+# Columns safe to hand to listing pages; the password is only read for authentication
+PUBLIC_COLUMNS = "user_id, username, email, role, created_at"
+AUTH_COLUMNS = "user_id, username, email, password, role"
+
+def _quote(value):
+    # Double-quote a value for a PostgREST logic filter so commas, dots and parentheses stay literal
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+@instrument_dao
 class UserDAO:
+    @memoized
+    def get_by_id(self, user_id):
+        res = get_client().table("users").select(PUBLIC_COLUMNS).eq("user_id", user_id).execute()
+        return User.from_row(res.data[0]) if res.data else None
+
     def get_by_username(self, username):
-        res = client.table("users").select("*").eq("username", username).execute()
-        return res.data[0] if res.data else None
+        res = get_client().table("users").select(AUTH_COLUMNS).eq("username", username).execute()
+        return User.from_row(res.data[0]) if res.data else None
 
     def get_by_email(self, email):
-        res = client.table("users").select("*").eq("email", email).execute()
-        return res.data[0] if res.data else None
+        res = get_client().table("users").select(AUTH_COLUMNS).eq("email", email).execute()
+        return User.from_row(res.data[0]) if res.data else None
 
+    def get_by_username_or_email(self, username_or_email):
+        # One round trip for login; a username match wins over another user's email
+        value = _quote(username_or_email)
+        res = get_client().table("users").select(AUTH_COLUMNS) \
+            .or_(f"username.eq.{value},email.eq.{value}").limit(2).execute()
+        rows = res.data or []
+        for row in rows:
+            if row.get("username") == username_or_email:
+                return User.from_row(row)
+        return User.from_row(rows[0]) if rows else None
+
+    @invalidates
     def create(self, username, email, password, role):
-        res = client.table("users").insert({
+        res = get_client().table("users").insert({
             "username": username, "email": email, "password": password, "role": role
         }).execute()
-        return res.data[0] if res.data else None
+        return User.from_row(res.data[0]) if res.data else None
+
+    @invalidates
+    def update_password(self, user_id, password_hash):
+        get_client().table("users").update({"password": password_hash}).eq("user_id", user_id).execute()
 
+    @memoized
     def get_students(self):
         try:
-            res = client.table("users").select("*").eq("role", "student").execute()
+            res = get_client().table("users").select(PUBLIC_COLUMNS).eq("role", "student").execute()
             print(f"✅ Found {len(res.data)} students in database")
-            return res.data or []
+            return User.from_rows(res.data)
         except Exception as e:
             print(f"❌ Error getting students: {e}")
             return []
 
     # ADD THIS METHOD TO GET STUDENT COUNT
+    @memoized
     def get_student_count(self):
         try:
-            res = client.table("users").select("user_id", count="exact").eq("role", "student").execute()
+            res = get_client().table("users").select("user_id", count="exact").eq("role", "student").limit(1).execute()
             count = res.count if hasattr(res, 'count') else len(res.data) if res.data else 0
             print(f"✅ Total students count: {count}")
             return count
         except Exception as e:
             print(f"❌ Error getting student count: {e}")
-            return 0
\ No newline at end of file
+            return 0
+
+    def iter_users(self, columns=PUBLIC_COLUMNS, page_size=1000):
+        return iter_keyset("users", "user_id", columns, page_size)
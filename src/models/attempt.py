@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Optional
+from .base import RowModel
+
+@dataclass(slots=True)
+class Attempt(RowModel):
+    attempt_id: Optional[int] = None
+    user_id: Optional[int] = None
+    subject_id: Optional[int] = None
+    total_questions: Optional[int] = None
+    correct_answers: Optional[int] = None
+    score: Optional[float] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+@dataclass(slots=True)
+class AttemptAnswer(RowModel):
+    answer_id: Optional[int] = None
+    attempt_id: Optional[int] = None
+    question_id: Optional[int] = None
+    chosen_option: Optional[str] = None
+    is_correct: Optional[bool] = None
@@ -0,0 +1,55 @@
+from dataclasses import fields
+
+_MISSING = object()
+
+
+class RowModel:
+    """Read-only dict view over a slotted dataclass.
+
+    DAO results used to be plain dicts, so ``row['name']``, ``row.get('name')``
+    and ``to_dict()`` keep working on the compact model objects.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def field_names(cls):
+        names = cls.__dict__.get('_field_names_cache')
+        if names is None:
+            names = tuple(f.name for f in fields(cls))
+            type.__setattr__(cls, '_field_names_cache', names)
+        return names
+
+    @classmethod
+    def columns(cls):
+        # Comma-separated column list for select(), matching the model's fields
+        return ", ".join(cls.field_names())
+
+    @classmethod
+    def from_row(cls, row):
+        if row is None:
+            return None
+        names = cls.field_names()
+        return cls(**{k: v for k, v in row.items() if k in names})
+
+    @classmethod
+    def from_rows(cls, rows):
+        return [cls.from_row(row) for row in rows or []]
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.field_names()}
+
+    def keys(self):
+        return self.field_names()
+
+    def __getitem__(self, key):
+        if key not in self.field_names():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.field_names()
+
+    def get(self, key, default=None):
+        if key not in self.field_names():
+            return default
+        return getattr(self, key)
@@ -1,14 +1,19 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional
+from .base import RowModel
 
-@dataclass
-class Question:
-    question_id: Optional[int]
-    subject_id: int
-    question_text: str
-    option_a: str
-    option_b: str
-    option_c: str
-    option_d: str
-    correct_option: str
+@dataclass(slots=True)
+class Question(RowModel):
+    question_id: Optional[int] = None
+    subject_id: Optional[int] = None
+    question_text: Optional[str] = None
+    option_a: Optional[str] = None
+    option_b: Optional[str] = None
+    option_c: Optional[str] = None
+    option_d: Optional[str] = None
+    correct_option: Optional[str] = None
     created_by: Optional[int] = None
+
+    def without_answer(self):
+        # Copy that is safe to hand to the student taking the quiz
+        return replace(self, correct_option=None, created_by=None)
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from typing import Optional
+from .base import RowModel
+
+@dataclass(slots=True)
+class StudentStats(RowModel):
+    user_id: Optional[int] = None
+    attempt_count: Optional[int] = 0
+    score_sum: Optional[float] = 0
+    best_score: Optional[float] = None
+    last_attempt_at: Optional[str] = None
+
+    def avg_score(self):
+        return self.score_sum / self.attempt_count if self.attempt_count else 0
+
+@dataclass(slots=True)
+class StudentSubjectStats(RowModel):
+    user_id: Optional[int] = None
+    subject_id: Optional[int] = None
+    attempt_count: Optional[int] = 0
+    score_sum: Optional[float] = 0
+    best_score: Optional[float] = None
+    last_attempt_at: Optional[str] = None
+
+    def avg_score(self):
+        return self.score_sum / self.attempt_count if self.attempt_count else 0
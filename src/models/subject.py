@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+from typing import Optional
+from .base import RowModel
+
+@dataclass(slots=True)
+class Subject(RowModel):
+    subject_id: Optional[int] = None
+    name: Optional[str] = None
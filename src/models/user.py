@@ -1,12 +1,12 @@
 from dataclasses import dataclass
 from typing import Optional
-from datetime import datetime
+from .base import RowModel
 
-@dataclass
-class User:
-    user_id: Optional[int]
-    username: str
-    email: str
-    password: str
-    role: str
-    created_at: Optional[datetime] = None
+@dataclass(slots=True)
+class User(RowModel):
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+    role: Optional[str] = None
+    created_at: Optional[str] = None
@@ -2,10 +2,13 @@
 from dao.user_dao import UserDAO
 from dao.question_dao import QuestionDAO
 from dao.attempt_dao import AttemptDAO
+from dao.stats_dao import StatsDAO
+from services.item_analytics import get_item_analytics
 
 user_dao = UserDAO()
 question_dao = QuestionDAO()
 attempt_dao = AttemptDAO()  # Fixed variable name
+stats_dao = StatsDAO()
 
 class AdminService:
     def get_students(self):
@@ -20,6 +23,12 @@ class AdminService:
     def delete_question(self, question_id):
         return question_dao.delete(question_id)
 
+    def modify_questions(self, question_ids, fields):
+        return question_dao.update_many(question_ids, fields)
+
+    def delete_questions(self, question_ids):
+        return question_dao.delete_many(question_ids)
+
     def quiz_status(self, subject_id):
         return attempt_dao.get_active_status(subject_id)
 
@@ -29,16 +38,23 @@ class AdminService:
             students = user_dao.get_students()
             print(f"📊 Found {len(students)} students in database")
             
+            # One rollup row per student instead of scanning every attempt
+            try:
+                totals = {row.user_id: (row.attempt_count, row.avg_score()) for row in stats_dao.get_all_students()}
+            except Exception as e:
+                print(f"❌ Student rollups unavailable, reading attempts instead: {e}")
+                totals = {}
+            # Students without a rollup row (new, or stats not rebuilt since the
+            # upgrade) fall back to their attempts, as the student dashboard does
+            missing = [s.get('user_id') for s in students if s.get('user_id') not in totals]
+            if missing:
+                totals.update(self._totals_from_attempts(missing))
+            
             students_with_stats = []
             
             for student in students:
-                # Get attempts for this student
-                attempts = attempt_dao.get_user_attempts(student.get('user_id'))
-                
                 # Calculate stats
-                quizzes_taken = len(attempts)
-                total_score = sum(attempt.get('score', 0) for attempt in attempts)
-                avg_score = total_score / quizzes_taken if quizzes_taken > 0 else 0
+                quizzes_taken, avg_score = totals.get(student.get('user_id'), (0, 0))
                 
                 # Determine performance
                 performance = self._get_performance_level(avg_score)
@@ -61,6 +77,27 @@ class AdminService:
             traceback.print_exc()
             return False, str(e)
     
+    def _totals_from_attempts(self, user_ids):
+        scores = {}
+        for row in attempt_dao.get_scores_for_users(user_ids):
+            scores.setdefault(row['user_id'], []).append(row.get('score') or 0)
+        return {uid: (len(s), sum(s) / len(s)) for uid, s in scores.items()}
+
+    def rebuild_student_stats(self):
+        try:
+            return True, stats_dao.rebuild()
+        except Exception as e:
+            print(f"❌ Error rebuilding student stats: {e}")
+            return False, str(e)
+
+    def get_item_analytics(self, subject_id, refresh=False):
+        # Difficulty, discrimination and option choices for every question of the subject
+        try:
+            return True, get_item_analytics().subject_report(subject_id, refresh=refresh)
+        except Exception as e:
+            print(f"❌ Error computing item analytics: {e}")
+            return False, str(e)
+
     def _get_performance_level(self, score):
         if score >= 90:
             return 'Excellent'
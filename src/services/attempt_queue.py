@@ -0,0 +1,275 @@
+# src/services/attempt_queue.py
+"""Write-behind ingestion of quiz attempts through a durable local spool.
+
+With ATTEMPT_QUEUE_ENABLED, a submission is acknowledged as soon as its
+attempt row is committed to a local SQLite spool (ATTEMPT_SPOOL_PATH). A
+background worker inserts spooled rows into ``attempts`` in batches of up
+to ATTEMPT_QUEUE_BATCH_SIZE, backing off exponentially (capped at
+ATTEMPT_QUEUE_MAX_BACKOFF_SECONDS) while the backend is unavailable.
+Spooled rows carry their per-question ``answers``; a batch's attempts and
+answers are stored in one transaction, so neither is kept without the other.
+
+Delivery is at-least-once: a process killed between the insert and the
+spool cleanup re-sends that batch on restart. Rows the database itself
+rejects (errors carrying a code, e.g. a missing user) are retried one by one
+and set aside in the spool so they cannot block the rest. Several processes
+may share a spool file; rows are leased to one worker at a time.
+"""
+import atexit
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dao.attempt_dao import AttemptDAO
+from dao.config import get_bool_setting, get_float_setting, get_int_setting, get_setting, project_root
+from dao.metrics import registry
+
+_SPOOL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempt_spool (
+    spool_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    tries INTEGER NOT NULL DEFAULT 0,
+    leased_by TEXT,
+    leased_until REAL,
+    dead INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS attempt_spool_pending_idx ON attempt_spool (dead, spool_id);
+"""
+
+
+def queue_enabled():
+    return get_bool_setting("ATTEMPT_QUEUE_ENABLED", False)
+
+
+def _spool_path():
+    return get_setting("ATTEMPT_SPOOL_PATH", os.path.join(project_root, "data", "attempt_spool.db"))
+
+
+class AttemptQueue:
+    def __init__(self, path=None, on_saved=None, batch_size=None, flush_seconds=None, max_backoff=None):
+        self.path = path or _spool_path()
+        self.on_saved = on_saved
+        self.batch_size = batch_size or get_int_setting("ATTEMPT_QUEUE_BATCH_SIZE", 100)
+        self.flush_seconds = flush_seconds or get_float_setting("ATTEMPT_QUEUE_FLUSH_SECONDS", 1.0)
+        self.max_backoff = max_backoff or get_float_setting("ATTEMPT_QUEUE_MAX_BACKOFF_SECONDS", 60.0)
+        # A lease outlives any sane insert, so a crashed worker's rows are picked up again
+        self.lease_seconds = max(60.0, self.max_backoff * 2)
+        self.worker_id = uuid.uuid4().hex
+        self.adao = AttemptDAO()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            # Each enqueue must survive a crash once it is acknowledged
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.executescript(_SPOOL_SCHEMA)
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {"enqueued": 0, "inserted": 0, "rejected": 0, "batches": 0,
+                       "failed_batches": 0, "backoff_seconds": 0.0}
+        self._last_error = None
+        self._thread = threading.Thread(target=self._run, name="attempt-queue", daemon=True)
+        self._thread.start()
+
+    # --- producer side ---
+
+    def enqueue(self, row):
+        """Durably spool one attempt row; returns its spool id."""
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO attempt_spool (payload, enqueued_at) VALUES (?, ?)",
+                (json.dumps(row, default=str), time.time()),
+            )
+        with self._stats_lock:
+            self._stats["enqueued"] += 1
+        if self.pending() >= self.batch_size:
+            self._wake.set()
+        return cur.lastrowid
+
+    # --- worker side ---
+
+    def _claim(self):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT spool_id, payload FROM attempt_spool "
+                    "WHERE dead = 0 AND (leased_until IS NULL OR leased_until < ?) "
+                    "ORDER BY spool_id LIMIT ?",
+                    (now, self.batch_size),
+                ).fetchall()
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE attempt_spool SET leased_by = ?, leased_until = ? WHERE spool_id = ?",
+                        [(self.worker_id, now + self.lease_seconds, spool_id) for spool_id, _ in rows],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(spool_id, json.loads(payload)) for spool_id, payload in rows]
+
+    def _settle(self, done_ids, failed_ids, error=None, dead_ids=()):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("DELETE FROM attempt_spool WHERE spool_id = ?", [(i,) for i in done_ids])
+                self._conn.executemany(
+                    "UPDATE attempt_spool SET leased_by = NULL, leased_until = NULL, tries = tries + 1, "
+                    "last_error = ? WHERE spool_id = ?",
+                    [(error, i) for i in failed_ids],
+                )
+                self._conn.executemany(
+                    "UPDATE attempt_spool SET dead = 1, tries = tries + 1, last_error = ? WHERE spool_id = ?",
+                    [(error, i) for i in dead_ids],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _insert(self, rows):
+        # Attempts and their answers go in together, so a failed batch is retried whole
+        return self.adao.record_attempts(rows)
+
+    def _saved(self, attempts):
+        with self._stats_lock:
+            self._stats["inserted"] += len(attempts)
+        if self.on_saved:
+            for attempt in attempts:
+                try:
+                    self.on_saved(attempt)
+                except Exception as e:
+                    print(f"❌ Error after saving attempt: {e}")
+
+    def _insert_one_by_one(self, batch):
+        # The database refused the batch; find the rows it refuses and set them aside
+        for spool_id, row in batch:
+            try:
+                saved = self._insert([row])
+            except Exception as e:
+                if getattr(e, "code", None) is None:
+                    raise
+                print(f"❌ Attempt rejected by the database, kept in spool as #{spool_id}: {e}")
+                self._settle([], [], str(e)[:500], dead_ids=[spool_id])
+                with self._stats_lock:
+                    self._stats["rejected"] += 1
+                continue
+            self._settle([spool_id], [])
+            self._saved(saved)
+
+    def flush(self):
+        """Insert one batch of spooled attempts. Returns the number of rows it handled."""
+        batch = self._claim()
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        try:
+            try:
+                saved = self._insert([row for _, row in batch])
+            except Exception as e:
+                if getattr(e, "code", None) is None:
+                    raise
+                self._insert_one_by_one(batch)
+            else:
+                self._settle([spool_id for spool_id, _ in batch], [])
+                self._saved(saved)
+        except Exception as e:
+            self._settle([], [spool_id for spool_id, _ in batch], str(e)[:500])
+            registry.record("queue", "attempts.flush", time.perf_counter() - started, error=True, detail=str(e)[:200])
+            raise
+        registry.record("queue", "attempts.flush", time.perf_counter() - started, rows=len(batch))
+        with self._stats_lock:
+            self._stats["batches"] += 1
+        return len(batch)
+
+    def _run(self):
+        backoff = 0.0
+        while not self._stopping.is_set():
+            self._wake.wait(backoff or self.flush_seconds)
+            self._wake.clear()
+            try:
+                # Drain everything that is ready before sleeping again
+                while self.flush() >= self.batch_size and not self._stopping.is_set():
+                    pass
+                backoff = 0.0
+                self._last_error = None
+            except Exception as e:
+                # Jitter keeps several app processes from retrying in lockstep
+                backoff = min(self.max_backoff, max(self.flush_seconds, backoff * 2) * random.uniform(0.8, 1.2))
+                self._last_error = str(e)[:200]
+                with self._stats_lock:
+                    self._stats["failed_batches"] += 1
+                print(f"❌ Attempt queue flush failed, retrying in {backoff:.1f}s: {e}")
+            with self._stats_lock:
+                self._stats["backoff_seconds"] = backoff
+
+    def stop(self, timeout=5.0):
+        """Stop the worker after one last attempt to drain the spool."""
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline and self.flush():
+                pass
+        except Exception as e:
+            print(f"❌ Attempts left in spool at shutdown: {e}")
+
+    # --- monitoring ---
+
+    def pending(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM attempt_spool WHERE dead = 0").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            pending, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(enqueued_at) FROM attempt_spool WHERE dead = 0"
+            ).fetchone()
+            dead = self._conn.execute("SELECT COUNT(*) FROM attempt_spool WHERE dead = 1").fetchone()[0]
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["pending"] = pending
+        stats["dead"] = dead
+        # Ingestion lag: how long the oldest undelivered attempt has been waiting
+        stats["lag_seconds"] = round(time.time() - oldest, 3) if oldest else 0.0
+        return stats
+
+    def last_error(self):
+        return self._last_error
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_attempt_queue(on_saved=None):
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = AttemptQueue(on_saved=on_saved)
+                registry.add_gauges("eduquiz_attempt_queue", "Write-behind attempt queue state.", _queue.stats)
+                atexit.register(_queue.stop)
+                print(f"✅ Attempt queue spooling to {_queue.path}")
+    if on_saved is not None and _queue.on_saved is None:
+        _queue.on_saved = on_saved
+    return _queue
+
+
+def current_attempt_queue():
+    # The queue if this process has started one, without starting it
+    return _queue
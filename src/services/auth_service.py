@@ -1,8 +1,28 @@
 # src/services/auth_service.py
 from dao.user_dao import UserDAO
+from services.passwords import get_hasher, PasswordHasherBusy
 
 user_dao = UserDAO()
 
+UNIQUE_VIOLATION = "23505"
+
+def _duplicate_field(error):
+    # Which unique column a failed insert collided with, from the Postgres-style error
+    if getattr(error, "code", None) != UNIQUE_VIOLATION:
+        return None
+    text = f"{getattr(error, 'details', '') or ''} {getattr(error, 'message', '') or error}"
+    for field in ("username", "email"):
+        if f"({field})" in text or f"_{field}_" in text:
+            return field
+    return None
+
+def _rehash(user_id, password):
+    # Runs on the hashing pool, so it hashes inline rather than through get_hasher().hash()
+    try:
+        user_dao.update_password(user_id, get_hasher().hash_sync(password))
+    except Exception as e:
+        print(f"❌ Error rehashing password for user {user_id}: {e}")
+
 class AuthService:
     def register(self, username, email, password, role):
         try:
@@ -13,16 +33,16 @@ class AuthService:
             if role not in ['student', 'admin']:
                 return False, "Role must be 'student' or 'admin'"
             
-            # Check if username exists
-            if user_dao.get_by_username(username):
-                return False, "Username already exists"
-            
-            # Check if email exists
-            if user_dao.get_by_email(email):
-                return False, "Email already exists"
-            
-            # Create user
-            user = user_dao.create(username, email, password, role)
+            # Insert directly; the unique constraints on username and email reject duplicates
+            try:
+                user = user_dao.create(username, email, get_hasher().hash(password), role)
+            except Exception as e:
+                duplicate = _duplicate_field(e)
+                if duplicate == "username":
+                    return False, "Username already exists"
+                if duplicate == "email":
+                    return False, "Email already exists"
+                raise
             
             if user:
                 return True, {
@@ -43,18 +63,23 @@ class AuthService:
             if not username_or_email or not password:
                 return False, "Username/email and password are required"
             
-            # Try username first, then email
-            user = user_dao.get_by_username(username_or_email)
-            if not user:
-                user = user_dao.get_by_email(username_or_email)
+            # Username or email, resolved in a single query
+            user = user_dao.get_by_username_or_email(username_or_email)
             
             if not user:
                 return False, "User not found"
             
-            # Simple password check (in real app, use hashing)
-            if user.get("password") != password:
+            matches, needs_rehash = get_hasher().verify(password, user.get("password"))
+            if not matches:
                 return False, "Incorrect password"
             
+            if needs_rehash:
+                # Plaintext or outdated hash: upgrade it in the background
+                try:
+                    get_hasher().submit(_rehash, user.get("user_id"), password)
+                except PasswordHasherBusy:
+                    pass
+            
             # Return user data without password
             user_data = {
                 "user_id": user.get("user_id"),
@@ -64,6 +89,8 @@ class AuthService:
             }
             return True, user_data
             
+        except PasswordHasherBusy as e:
+            return False, str(e)
         except Exception as e:
             print(f"🚨 Login error: {e}")
             return False, f"Login failed: {str(e)}"
\ No newline at end of file
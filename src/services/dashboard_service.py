@@ -0,0 +1,59 @@
+# src/services/dashboard_service.py
+import asyncio
+from dao.attempt_dao import AttemptDAO
+from dao.stats_dao import StatsDAO
+from dao.async_dao import AsyncAttemptDAO, AsyncQuestionDAO, AsyncSubjectDAO, AsyncUserDAO
+
+async_user_dao = AsyncUserDAO()
+async_question_dao = AsyncQuestionDAO()
+async_attempt_dao = AsyncAttemptDAO()
+async_subject_dao = AsyncSubjectDAO()
+attempt_dao = AttemptDAO()
+stats_dao = StatsDAO()
+
+
+async def gather_queries(**queries):
+    # Runs independent awaitables concurrently; a failed query yields None instead of failing the page
+    names = list(queries)
+    results = await asyncio.gather(*queries.values(), return_exceptions=True)
+    gathered = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            print(f"❌ Dashboard query '{name}' failed: {result}")
+            result = None
+        gathered[name] = result
+    return gathered
+
+
+def run_queries(**queries):
+    return asyncio.run(gather_queries(**queries))
+
+
+class DashboardService:
+    def get_admin_metrics(self):
+        # Page latency is the slowest count query rather than the sum of all four
+        return run_queries(
+            total_students=async_user_dao.get_student_count(),
+            total_questions=async_question_dao.get_total_questions_count(),
+            total_attempts=async_attempt_dao.get_total_attempts_count(),
+            total_subjects=async_subject_dao.get_count(),
+        )
+
+    def get_student_metrics(self, user_id):
+        # Both student cards come from the student's rollup row
+        rollup = stats_dao.get_student(user_id)
+        if rollup:
+            return {
+                'quizzes_taken': rollup.attempt_count,
+                'avg_score': rollup.avg_score(),
+            }
+        # No rollup yet (new student, or stats not rebuilt since the upgrade)
+        attempts = attempt_dao.get_user_attempts(user_id)
+        if attempts:
+            avg_score = sum(a['score'] for a in attempts) / len(attempts)
+        else:
+            avg_score = 0
+        return {
+            'quizzes_taken': len(attempts),
+            'avg_score': avg_score,
+        }
@@ -0,0 +1,69 @@
+# src/services/export_service.py
+import csv
+import json
+import os
+import time
+from dao.attempt_dao import AttemptDAO
+from dao.question_dao import QuestionDAO
+from dao.user_dao import UserDAO
+from dao.config import get_int_setting, get_setting, project_root
+
+attempt_dao = AttemptDAO()
+question_dao = QuestionDAO()
+user_dao = UserDAO()
+
+# Columns written per dataset; passwords are never exported
+EXPORT_COLUMNS = {
+    "attempts": ["attempt_id", "user_id", "subject_id", "total_questions",
+                 "correct_answers", "score", "started_at", "finished_at"],
+    "users": ["user_id", "username", "email", "role", "created_at"],
+    "questions": ["question_id", "subject_id", "question_text", "option_a", "option_b",
+                  "option_c", "option_d", "correct_option", "created_by", "created_at"],
+}
+EXPORT_FORMATS = ["csv", "jsonl"]
+
+
+class ExportService:
+    def iter_rows(self, dataset):
+        columns = ", ".join(EXPORT_COLUMNS[dataset])
+        page_size = get_int_setting("EXPORT_PAGE_SIZE", 1000)
+        if dataset == "attempts":
+            return attempt_dao.iter_attempts(columns, page_size)
+        if dataset == "users":
+            return user_dao.iter_users(columns, page_size)
+        return question_dao.iter_questions(columns, page_size)
+
+    def write(self, dataset, fmt, out):
+        """Stream ``dataset`` into the text stream ``out``; returns the number of rows written."""
+        if dataset not in EXPORT_COLUMNS:
+            raise ValueError(f"Unknown dataset: {dataset}")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+
+        columns = EXPORT_COLUMNS[dataset]
+        count = 0
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for row in self.iter_rows(dataset):
+                writer.writerow([row.get(c) for c in columns])
+                count += 1
+        else:
+            for row in self.iter_rows(dataset):
+                out.write(json.dumps({c: row.get(c) for c in columns}, default=str) + "\n")
+                count += 1
+        return count
+
+    def export_to_file(self, dataset, fmt, path=None):
+        try:
+            if path is None:
+                export_dir = get_setting("EXPORT_DIR", os.path.join(project_root, "exports"))
+                os.makedirs(export_dir, exist_ok=True)
+                path = os.path.join(export_dir, f"{dataset}_{time.strftime('%Y%m%d_%H%M%S')}.{fmt}")
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                count = self.write(dataset, fmt, f)
+            print(f"✅ Exported {count} {dataset} rows to {path}")
+            return True, {"path": path, "rows": count}
+        except Exception as e:
+            print(f"❌ Error exporting {dataset}: {e}")
+            return False, str(e)
@@ -0,0 +1,110 @@
+# src/services/grading.py
+"""Vectorized quiz grading.
+
+A subject's answer key is encoded once as an int8 array (A=0 .. D=3)
+aligned with its question ids. Submissions are encoded the same way,
+with -1 for unanswered questions, so grading one attempt or a whole
+exam-day batch is a single NumPy comparison.
+"""
+from dataclasses import dataclass
+import numpy as np
+
+OPTIONS = "ABCD"
+UNANSWERED = -1
+_CODES = {option: code for code, option in enumerate(OPTIONS)}
+
+
+def encode_option(option):
+    if not option:
+        return UNANSWERED
+    return _CODES.get(str(option).strip().upper(), UNANSWERED)
+
+
+def decode_option(code):
+    return OPTIONS[code] if 0 <= code < len(OPTIONS) else None
+
+
+@dataclass(slots=True)
+class GradeResult:
+    correct: np.ndarray  # per-question correctness, aligned with AnswerKey.question_ids
+    correct_count: int
+    total: int
+    score: float
+    chosen: np.ndarray = None  # encoded submitted options, aligned the same way
+
+    def answer_rows(self, key):
+        """One {question_id, chosen_option, is_correct} row per question of ``key``."""
+        return [
+            {"question_id": int(qid), "chosen_option": decode_option(int(code)), "is_correct": bool(ok)}
+            for qid, code, ok in zip(key.question_ids, self.chosen, self.correct)
+        ]
+
+
+class AnswerKey:
+    def __init__(self, question_ids, correct_options):
+        self.question_ids = np.asarray(question_ids, dtype=np.int64)
+        self.codes = np.fromiter(
+            (encode_option(option) for option in correct_options),
+            dtype=np.int8,
+            count=len(self.question_ids),
+        )
+        self._positions = {int(qid): pos for pos, qid in enumerate(self.question_ids)}
+
+    @classmethod
+    def from_questions(cls, questions):
+        return cls(
+            [q['question_id'] for q in questions],
+            [q['correct_option'] for q in questions],
+        )
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __contains__(self, question_id):
+        return int(question_id) in self._positions
+
+    def subset(self, question_ids):
+        # Key restricted to (and ordered like) the given questions, e.g. a sampled quiz
+        positions = [self._positions[int(qid)] for qid in question_ids]
+        return AnswerKey(self.question_ids[positions], [decode_option(c) for c in self.codes[positions]])
+
+    def encode_answers(self, answers):
+        """Encode a {question_id: option} mapping as an int8 vector aligned with this key."""
+        encoded = np.full(len(self), UNANSWERED, dtype=np.int8)
+        for question_id, option in answers.items():
+            pos = self._positions.get(int(question_id))
+            if pos is not None:
+                encoded[pos] = encode_option(option)
+        return encoded
+
+    def is_correct(self, question_id, option):
+        pos = self._positions.get(int(question_id))
+        code = encode_option(option)
+        return pos is not None and code != UNANSWERED and code == self.codes[pos]
+
+    def grade(self, answers):
+        encoded = answers if isinstance(answers, np.ndarray) else self.encode_answers(answers)
+        # A blank answer never matches, even against a missing or invalid key
+        correct = (encoded == self.codes) & (encoded != UNANSWERED)
+        correct_count = int(correct.sum())
+        total = len(self)
+        score = correct_count / total * 100 if total > 0 else 0
+        return GradeResult(correct, correct_count, total, score, encoded)
+
+    def grade_batch(self, submissions):
+        """Grade many submissions at once.
+
+        ``submissions`` is either a list of {question_id: option} mappings or an
+        already encoded (n_submissions, n_questions) int8 matrix. Returns the
+        boolean correctness matrix, correct counts and percentage scores.
+        """
+        if isinstance(submissions, np.ndarray):
+            matrix = submissions
+        else:
+            matrix = np.full((len(submissions), len(self)), UNANSWERED, dtype=np.int8)
+            for row, answers in enumerate(submissions):
+                matrix[row] = self.encode_answers(answers)
+        correct = (matrix == self.codes) & (matrix != UNANSWERED)
+        correct_counts = correct.sum(axis=1)
+        scores = correct_counts / len(self) * 100 if len(self) else np.zeros(len(matrix))
+        return correct, correct_counts, scores
@@ -0,0 +1,123 @@
+# src/services/import_service.py
+import csv
+import io
+import json
+import os
+from dao.question_dao import QuestionDAO
+from dao.config import get_int_setting
+from services.question_service import QuestionService, REQUIRED_FIELDS
+
+question_dao = QuestionDAO()
+question_service = QuestionService()
+
+QUESTION_COLUMNS = REQUIRED_FIELDS
+
+
+def iter_question_rows(fileobj, fmt):
+    """Yield (row_number, row, parse_error) from a CSV, JSON Lines or JSON array stream."""
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(fileobj), 1):
+            yield number, row, None
+    elif fmt == "jsonl":
+        for number, line in enumerate(fileobj, 1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line), None
+            except ValueError as e:
+                yield number, None, f"Invalid JSON: {e}"
+    elif fmt == "json":
+        # A JSON array has to be parsed as a whole; use JSON Lines for very large banks
+        for number, row in enumerate(json.load(fileobj), 1):
+            yield number, row, None
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def detect_format(filename):
+    ext = os.path.splitext(filename)[1].lower().lstrip(".")
+    return {"csv": "csv", "json": "json", "jsonl": "jsonl", "ndjson": "jsonl"}.get(ext)
+
+
+class QuestionImportService:
+    def import_file(self, path, created_by, batch_size=None):
+        fmt = detect_format(path)
+        if not fmt:
+            return False, "File must be .csv, .json or .jsonl"
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                return True, self.import_stream(f, fmt, created_by, batch_size)
+        except (OSError, ValueError) as e:
+            return False, f"Could not read {path}: {e}"
+
+    def import_upload(self, uploaded_file, created_by, batch_size=None):
+        # Streamlit UploadedFile (or any binary stream with a .name)
+        fmt = detect_format(uploaded_file.name)
+        if not fmt:
+            return False, "File must be .csv, .json or .jsonl"
+        try:
+            text = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline="")
+            return True, self.import_stream(text, fmt, created_by, batch_size)
+        except ValueError as e:
+            return False, f"Could not read {uploaded_file.name}: {e}"
+
+    def import_stream(self, fileobj, fmt, created_by, batch_size=None):
+        batch_size = batch_size or get_int_setting("IMPORT_BATCH_SIZE", 500)
+        report = {"total": 0, "imported": 0, "failed": 0, "errors": []}
+        batch = []
+        for number, raw, error in iter_question_rows(fileobj, fmt):
+            report["total"] += 1
+            if not error:
+                row, error = self._prepare_row(raw, created_by)
+            if error:
+                self._fail(report, number, error)
+                continue
+            batch.append((number, row))
+            if len(batch) >= batch_size:
+                self._flush(batch, report)
+                batch = []
+        if batch:
+            self._flush(batch, report)
+        report["errors"].sort(key=lambda err: err["row"])
+        print(f"✅ Question import finished: {report['imported']} imported, {report['failed']} failed")
+        return report
+
+    def _prepare_row(self, raw, created_by):
+        if not isinstance(raw, dict):
+            return None, "Row is not an object"
+        row = {}
+        for field in QUESTION_COLUMNS:
+            value = raw.get(field)
+            row[field] = value.strip() if isinstance(value, str) else value
+        # Imported questions belong to the importing admin, whatever the file says
+        row['created_by'] = created_by
+        if row.get('correct_option'):
+            row['correct_option'] = str(row['correct_option']).upper()
+        error = question_service.validate_question(row)
+        if error:
+            return None, error
+        try:
+            row['subject_id'] = int(row['subject_id'])
+            row['created_by'] = int(row['created_by'])
+        except (TypeError, ValueError):
+            return None, "subject_id and created_by must be integers"
+        return row, None
+
+    def _flush(self, batch, report):
+        try:
+            inserted = question_dao.create_many([row for _, row in batch])
+            report["imported"] += len(inserted)
+            return
+        except Exception as e:
+            print(f"❌ Batch insert of {len(batch)} questions failed, retrying row by row: {e}")
+        # A batch insert is all-or-nothing; isolate the offending rows one at a time
+        for number, row in batch:
+            try:
+                question_dao.create_many([row])
+                report["imported"] += 1
+            except Exception as e:
+                self._fail(report, number, getattr(e, "message", None) or str(e))
+
+    def _fail(self, report, number, error):
+        report["failed"] += 1
+        report["errors"].append({"row": number, "error": error})
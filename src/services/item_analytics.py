@@ -0,0 +1,181 @@
+# src/services/item_analytics.py
+"""Item analytics over stored responses (attempt_answers).
+
+Per question: difficulty (p-value, the share of responses that are
+correct), point-biserial discrimination (correlation between answering it
+correctly and the attempt's score) and how often each option was chosen,
+with the mean attempt score of the students who chose it.
+
+Everything derives from per-(question, option) response counts, score sums
+and squared-score sums, which the database aggregates in the
+question_option_stats view: a few rows per question however many responses
+are stored, and always consistent with deleted attempts and questions. The
+statistics are then computed for all questions at once with NumPy.
+Correctness is taken from the question's *current* key, so fixing a wrong
+key re-grades the statistics at once. Subject reports are cached for
+ITEM_ANALYTICS_TTL seconds.
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from dao.attempt_dao import AttemptDAO
+from dao.question_dao import QuestionDAO
+from dao.cache import TTLCache
+from dao.config import get_int_setting
+from services.grading import OPTIONS, encode_option
+
+_SLOTS = len(OPTIONS) + 1  # A..D, then unanswered
+_UNANSWERED_SLOT = len(OPTIONS)
+_SLOT_OF_OPTION = {option: slot for slot, option in enumerate(OPTIONS)}
+
+
+@dataclass(slots=True)
+class ItemStats:
+    question_id: int
+    correct_option: Optional[str]
+    responses: int = 0
+    p_value: Optional[float] = None
+    discrimination: Optional[float] = None
+    option_counts: dict = field(default_factory=dict)  # option -> times chosen ("-" = unanswered)
+    option_mean_scores: dict = field(default_factory=dict)  # option -> mean attempt score of choosers
+    flags: list = field(default_factory=list)
+
+
+class ItemAnalytics:
+    def __init__(self, ttl=None):
+        self.min_responses = get_int_setting("ITEM_ANALYTICS_MIN_RESPONSES", 20)
+        self.adao = AttemptDAO()
+        self.qdao = QuestionDAO()
+        self._reports = TTLCache(
+            maxsize=get_int_setting("QUESTION_CACHE_MAXSIZE", 256),
+            ttl=ttl if ttl is not None else get_int_setting("ITEM_ANALYTICS_TTL", 60),
+        )
+
+    def reset(self):
+        # Forget cached reports; the next request re-reads the aggregates
+        self._reports.clear()
+
+    # --- statistics ---
+
+    def _sums(self, question_ids):
+        """(counts, score sums, squared-score sums) arrays, one row per question, one column per option."""
+        row_of = {qid: row for row, qid in enumerate(question_ids)}
+        counts = np.zeros((len(question_ids), _SLOTS), dtype=np.int64)
+        sums = np.zeros((len(question_ids), _SLOTS))
+        squares = np.zeros((len(question_ids), _SLOTS))
+        for stat in self.adao.get_option_stats(question_ids):
+            row = row_of.get(stat['question_id'])
+            if row is None:
+                continue
+            slot = _SLOT_OF_OPTION.get(stat['chosen_option'], _UNANSWERED_SLOT)
+            counts[row, slot] += stat['responses']
+            # Scores are stored as percentages; the statistics work on 0..1
+            sums[row, slot] += (stat['score_sum'] or 0) / 100
+            squares[row, slot] += (stat['score_squares'] or 0) / 10000
+        return counts, sums, squares
+
+    def item_stats(self, questions):
+        """ItemStats for each question (rows with question_id and correct_option)."""
+        questions = list(questions)
+        counts, sums, squares = self._sums([q['question_id'] for q in questions])
+        keys = np.array([encode_option(q['correct_option']) for q in questions], dtype=np.int64)
+        p, r = _difficulty_and_discrimination(counts, sums, squares, keys)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            option_means = sums / counts * 100
+
+        labels = list(OPTIONS) + ["-"]
+        results = []
+        for row, q in enumerate(questions):
+            stats = ItemStats(q['question_id'], q['correct_option'])
+            stats.responses = int(counts[row].sum())
+            if stats.responses:
+                stats.p_value = _number(p[row])
+                stats.discrimination = _number(r[row])
+                stats.option_counts = {label: int(n) for label, n in zip(labels, counts[row])}
+                stats.option_mean_scores = {label: _number(m) for label, m in zip(labels, option_means[row])}
+            stats.flags = self._flags(stats)
+            results.append(stats)
+        return results
+
+    def subject_report(self, subject_id, refresh=False):
+        """Item stats for every question of a subject plus subject-level means (cached)."""
+        if refresh:
+            self._reports.invalidate(subject_id)
+        return self._reports.get_or_load(subject_id, lambda: self._subject_report(subject_id))
+
+    def _subject_report(self, subject_id):
+        items = self.item_stats(self.qdao.get_answer_rows(subject_id))
+        answered = [i for i in items if i.responses]
+        p_values = [i.p_value for i in answered if i.p_value is not None]
+        discriminations = [i.discrimination for i in answered if i.discrimination is not None]
+        return {
+            "subject_id": subject_id,
+            "questions": len(items),
+            "responses": sum(i.responses for i in items),
+            "mean_p_value": float(np.mean(p_values)) if p_values else None,
+            "mean_discrimination": float(np.mean(discriminations)) if discriminations else None,
+            "flagged": sum(1 for i in items if i.flags),
+            "items": items,
+        }
+
+    def _flags(self, stats):
+        if stats.responses < self.min_responses or stats.p_value is None:
+            return []
+        flags = []
+        if stats.p_value > 0.9:
+            flags.append("too easy")
+        elif stats.p_value < 0.2:
+            flags.append("too hard")
+        if stats.discrimination is not None:
+            if stats.discrimination < 0:
+                flags.append("negative discrimination")
+            elif stats.discrimination < 0.2:
+                flags.append("low discrimination")
+        key_mean = stats.option_mean_scores.get(stats.correct_option)
+        for option in OPTIONS:
+            mean = stats.option_mean_scores.get(option)
+            if option != stats.correct_option and stats.option_counts.get(option) and key_mean is not None \
+                    and mean is not None and mean > key_mean:
+                # Stronger students prefer a distractor: often a wrong key or an ambiguous option
+                flags.append(f"check key ({option} chosen by stronger students)")
+                break
+        return flags
+
+
+def _difficulty_and_discrimination(counts, sums, squares, keys):
+    """Vectorized p-values and point-biserial correlations, one per row."""
+    rows = np.arange(len(counts))
+    valid = (keys >= 0) & (keys < len(OPTIONS))
+    key_cols = np.where(valid, keys, 0)
+    n = counts.sum(axis=1).astype(float)
+    n1 = np.where(valid, counts[rows, key_cols], 0).astype(float)
+    s = sums.sum(axis=1)
+    s1 = np.where(valid, sums[rows, key_cols], 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = np.where(valid, n1 / n, np.nan)
+        mean = s / n
+        sd = np.sqrt(np.maximum(squares.sum(axis=1) / n - mean * mean, 0))
+        m1 = s1 / n1
+        m0 = (s - s1) / (n - n1)
+        r = (m1 - m0) / sd * np.sqrt(p * (1 - p))
+    # Undefined when everyone (or no one) got it right or all scores are equal
+    r[~np.isfinite(r)] = np.nan
+    return p, r
+
+
+def _number(value):
+    return None if value is None or not np.isfinite(value) else round(float(value), 4)
+
+
+_analytics = None
+_analytics_lock = threading.Lock()
+
+
+def get_item_analytics():
+    global _analytics
+    if _analytics is None:
+        with _analytics_lock:
+            if _analytics is None:
+                _analytics = ItemAnalytics()
+    return _analytics
@@ -0,0 +1,126 @@
+# src/services/leaderboard_service.py
+import bisect
+import threading
+import time
+from dao.attempt_dao import AttemptDAO
+from dao.user_dao import UserDAO
+from dao.subject_dao import SubjectDAO
+from dao.config import get_int_setting
+
+attempt_dao = AttemptDAO()
+user_dao = UserDAO()
+subject_dao = SubjectDAO()
+
+
+def _board_size():
+    return get_int_setting("LEADERBOARD_SIZE", 10)
+
+
+def _refresh_seconds():
+    # Full reload interval, so attempts written by other processes show up (0 disables)
+    return get_int_setting("LEADERBOARD_REFRESH_SECONDS", 300)
+
+
+class _TopK:
+    """Entries kept sorted by score (highest first), earlier attempts winning ties."""
+
+    def __init__(self, size):
+        self.size = size
+        self.keys = []
+        self.entries = []
+
+    def add(self, entry):
+        attempt_id = entry.get('attempt_id')
+        if attempt_id is not None and any(e.get('attempt_id') == attempt_id for e in self.entries):
+            return False
+        key = (-(entry.get('score') or 0), entry.get('attempt_id') or float('inf'))
+        pos = bisect.bisect_right(self.keys, key)
+        if pos >= self.size:
+            return False
+        self.keys.insert(pos, key)
+        self.entries.insert(pos, entry)
+        del self.keys[self.size:], self.entries[self.size:]
+        return True
+
+    def qualifies(self, score):
+        return len(self.entries) < self.size or score > -self.keys[-1][0]
+
+
+# Process-wide boards: None means "not loaded yet", per-subject boards load on first read
+_lock = threading.Lock()
+_global_board = None
+_subject_boards = {}
+_usernames = {}
+_loaded_at = 0.0
+
+
+class LeaderboardService:
+    def get_top(self, subject_id=None, limit=None):
+        size = _board_size()
+        limit = min(limit or size, size)
+        board = self._board(subject_id)
+        with _lock:
+            return [dict(entry) for entry in board.entries[:limit]]
+
+    def record_attempt(self, attempt):
+        # Boards that are not loaded yet will pick the attempt up from storage
+        with _lock:
+            boards = [_global_board, _subject_boards.get(attempt.get('subject_id'))]
+            boards = [b for b in boards if b is not None and b.qualifies(attempt.get('score') or 0)]
+        if not boards:
+            return
+        entry = self._make_entry(attempt)
+        with _lock:
+            for board in boards:
+                board.add(entry)
+
+    def rebuild(self):
+        global _global_board, _loaded_at
+        board = self._load(None)
+        with _lock:
+            _global_board = board
+            _subject_boards.clear()
+            _loaded_at = time.monotonic()
+        print(f"✅ Leaderboard rebuilt with {len(board.entries)} entries")
+
+    def _board(self, subject_id):
+        refresh = _refresh_seconds()
+        expired = refresh > 0 and time.monotonic() - _loaded_at > refresh
+        if _global_board is None or expired:
+            self.rebuild()
+        if subject_id is None:
+            return _global_board
+        board = _subject_boards.get(subject_id)
+        if board is None:
+            board = self._load(subject_id)
+            with _lock:
+                board = _subject_boards.setdefault(subject_id, board)
+        return board
+
+    def _load(self, subject_id):
+        board = _TopK(_board_size())
+        for row in attempt_dao.get_top_attempts(board.size, subject_id):
+            username = (row.get('users') or {}).get('username')
+            if username:
+                _usernames[row.get('user_id')] = username
+            board.add(row)
+        return board
+
+    def _make_entry(self, attempt):
+        user_id = attempt.get('user_id')
+        username = _usernames.get(user_id)
+        if username is None:
+            user = user_dao.get_by_id(user_id)
+            username = user.get('username') if user else "Unknown"
+            _usernames[user_id] = username
+        subject = subject_dao.get_by_id(attempt.get('subject_id'))
+        return {
+            'attempt_id': attempt.get('attempt_id'),
+            'user_id': user_id,
+            'subject_id': attempt.get('subject_id'),
+            'score': attempt.get('score'),
+            'correct_answers': attempt.get('correct_answers'),
+            'total_questions': attempt.get('total_questions'),
+            'users': {'username': username},
+            'subjects': {'name': subject['name'] if subject else "Unknown Subject"},
+        }
@@ -0,0 +1,143 @@
+# src/services/passwords.py
+"""Password hashing with scrypt on a bounded worker pool.
+
+Hashes are stored as ``scrypt$<n>$<r>$<p>$<salt>$<hash>`` (base64 parts), so
+the cost parameters (PASSWORD_SCRYPT_N/R/P) can be raised later: rows
+hashed with older parameters, or still holding a plaintext password, verify
+as before and are flagged for rehashing on the next successful login.
+
+hashlib.scrypt releases the GIL, so the pool spreads login storms across
+cores instead of serializing them in the Streamlit session threads. At most
+PASSWORD_HASH_QUEUE jobs may be waiting; beyond that callers get a
+``PasswordHasherBusy`` after PASSWORD_HASH_TIMEOUT_SECONDS.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dao.config import get_float_setting, get_int_setting
+from dao.metrics import registry
+
+SCHEME = "scrypt"
+_SALT_BYTES = 16
+_KEY_BYTES = 64
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _derive(password, salt, n, r, p):
+    # scrypt needs 128 * r * n bytes; leave headroom over hashlib's 32 MiB default
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          dklen=_KEY_BYTES, maxmem=256 * r * n + 1024 * 1024)
+
+
+class PasswordHasher:
+    def __init__(self, n=None, r=None, p=None, workers=None, max_queue=None, timeout=None):
+        self.n = n or get_int_setting("PASSWORD_SCRYPT_N", 2 ** 14)
+        self.r = r or get_int_setting("PASSWORD_SCRYPT_R", 8)
+        self.p = p or get_int_setting("PASSWORD_SCRYPT_P", 1)
+        workers = workers or get_int_setting("PASSWORD_HASH_WORKERS", os.cpu_count() or 2)
+        max_queue = max_queue or get_int_setting("PASSWORD_HASH_QUEUE", 64)
+        self.timeout = timeout or get_float_setting("PASSWORD_HASH_TIMEOUT_SECONDS", 10.0)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._stats = {"workers": workers, "max_queue": max_queue, "pending": 0, "running": 0,
+                       "peak_queue_depth": 0, "completed": 0, "rejected": 0, "total_seconds": 0.0}
+
+    # --- hashing primitives (run on the pool) ---
+
+    def _hash(self, password):
+        salt = os.urandom(_SALT_BYTES)
+        key = _derive(password, salt, self.n, self.r, self.p)
+        return f"{SCHEME}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(key)}"
+
+    def _verify(self, password, stored):
+        if not stored:
+            return False, False
+        if not stored.startswith(SCHEME + "$"):
+            # Legacy plaintext row: accept once, then migrate
+            ok = hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+            return ok, ok
+        try:
+            _, n, r, p, salt, key = stored.split("$")
+            n, r, p = int(n), int(r), int(p)
+            expected = base64.b64decode(key)
+            actual = _derive(password, base64.b64decode(salt), n, r, p)
+        except ValueError:
+            return False, False
+        ok = hmac.compare_digest(actual, expected)
+        return ok, ok and (n, r, p) != (self.n, self.r, self.p)
+
+    # --- pool ---
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise PasswordHasherBusy("Password hashing queue is full, please try again")
+        with self._lock:
+            self._stats["pending"] += 1
+            depth = self._stats["pending"] - self._stats["running"]
+            self._stats["peak_queue_depth"] = max(self._stats["peak_queue_depth"], depth)
+        started = time.perf_counter()
+
+        def job():
+            with self._lock:
+                self._stats["running"] += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._stats["pending"] -= 1
+                    self._stats["running"] -= 1
+                    self._stats["completed"] += 1
+                    self._stats["total_seconds"] += time.perf_counter() - started
+                self._slots.release()
+        return self._pool.submit(job)
+
+    def hash(self, password):
+        return self._run(self._hash, password).result()
+
+    def hash_sync(self, password):
+        # Hashes on the calling thread; for work already running on the pool,
+        # where hash() would wait on a pool slot that the caller itself holds
+        return self._hash(password)
+
+    def verify(self, password, stored):
+        """Returns (matches, needs_rehash)."""
+        return self._run(self._verify, password, stored).result()
+
+    def submit(self, fn, *args):
+        # Background work (e.g. rehash and store) that should not hold up the caller
+        return self._run(fn, *args)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = stats["pending"] - stats["running"]
+        stats["avg_ms"] = stats.pop("total_seconds") / stats["completed"] * 1000 if stats["completed"] else 0.0
+        return stats
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_hasher():
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher()
+                registry.add_gauges("eduquiz_password_hasher", "Password hashing pool state.", _hasher.stats)
+    return _hasher
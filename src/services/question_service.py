@@ -3,15 +3,25 @@ from dao.question_dao import QuestionDAO
 
 question_dao = QuestionDAO()
 
+REQUIRED_FIELDS = ['subject_id', 'question_text', 'option_a', 'option_b',
+                   'option_c', 'option_d', 'correct_option', 'created_by']
+
 class QuestionService:
+    def validate_question(self, question_data):
+        # Returns an error message, or None when the question can be saved
+        for field in REQUIRED_FIELDS:
+            if not question_data.get(field):
+                return f"Missing required field: {field}"
+        if str(question_data['correct_option']).upper() not in ['A', 'B', 'C', 'D']:
+            return "Correct option must be A, B, C, or D"
+        return None
+
     def create_question(self, question_data):
         try:
             # Validate required fields
-            required_fields = ['subject_id', 'question_text', 'option_a', 'option_b', 
-                               'option_c', 'option_d', 'correct_option', 'created_by']
-            for field in required_fields:
-                if not question_data.get(field):
-                    return False, f"Missing required field: {field}"
+            error = self.validate_question(question_data)
+            if error:
+                return False, error
             
             # Save question in DB
             question = question_dao.create(question_data)
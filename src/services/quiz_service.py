@@ -1,16 +1,17 @@
-from src.dao.question_dao import QuestionDAO
+from dao.question_dao import QuestionDAO
+from services.sampling import generate_quiz
 
 
 question_dao = QuestionDAO()
 
 
 class QuizService:
-    def get_quiz(self, subject_id: int):
-        questions = question_dao.get_by_subject(subject_id)
+    def get_quiz(self, subject_id: int, count: int = None, seed: int = None, stratify: bool = False):
+        questions = generate_quiz(question_dao, subject_id, count, seed, stratify)
         if not questions:
             return False, "No questions available for this subject"
 
-        # Ensure we only expose safe fields and normalize shape
+        # Ensure we only expose safe fields and normalize shape; answers never leave the server
         sanitized = []
         for q in questions:
             sanitized.append(
@@ -22,7 +23,6 @@ class QuizService:
                     "option_b": q.get("option_b"),
                     "option_c": q.get("option_c"),
                     "option_d": q.get("option_d"),
-                    "correct_option": q.get("correct_option"),
                 }
             )
 
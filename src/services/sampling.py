@@ -0,0 +1,78 @@
+# src/services/sampling.py
+"""Quiz generation by sampling from a subject's question id index.
+
+Only the sampled questions' rows are fetched afterwards, so starting a
+quiz costs the same whether a subject has fifty questions or fifty thousand.
+"""
+import random
+from collections import defaultdict
+from dao.config import get_int_setting
+
+
+def default_question_count():
+    # 0 means "every question in the subject"
+    return get_int_setting("QUIZ_QUESTION_COUNT", 0)
+
+
+def sample_question_ids(index_rows, count, seed=None, stratify=False):
+    """Pick ``count`` question ids from rows carrying question_id and correct_option.
+
+    The same seed over the same index always yields the same quiz. With
+    ``stratify`` the sample keeps the subject's mix of correct options, so
+    a short quiz is not dominated by one answer letter.
+    """
+    rng = random.Random(seed)
+    ids = [row['question_id'] for row in index_rows]
+    if count is None or count <= 0 or count >= len(ids):
+        rng.shuffle(ids)
+        return ids
+    if not stratify:
+        return rng.sample(ids, count)
+
+    strata = defaultdict(list)
+    for row in index_rows:
+        strata[row['correct_option']].append(row['question_id'])
+
+    # Proportional allocation; leftover slots go to the largest remainders
+    total = len(ids)
+    quotas = {}
+    remainders = []
+    for option, members in strata.items():
+        exact = count * len(members) / total
+        quotas[option] = int(exact)
+        remainders.append((exact - int(exact), option))
+    for _, option in sorted(remainders, key=lambda r: (-r[0], str(r[1])))[:count - sum(quotas.values())]:
+        quotas[option] += 1
+
+    picked = []
+    for option in sorted(strata, key=str):
+        picked.extend(rng.sample(strata[option], quotas[option]))
+    rng.shuffle(picked)
+    return picked
+
+
+def quiz_question_ids(qdao, subject_id, count=None, seed=None, stratify=False):
+    """Just the ids of one quiz's questions, from the cached per-subject index."""
+    if count is None:
+        count = default_question_count()
+    index = qdao.get_answer_rows(subject_id)
+    if count <= 0:
+        ids = [row['question_id'] for row in index]
+        if seed is not None:
+            random.Random(seed).shuffle(ids)
+        return ids
+    return sample_question_ids(index, count, seed, stratify)
+
+
+def generate_quiz(qdao, subject_id, count=None, seed=None, stratify=False):
+    """Questions for one quiz, answers included; callers strip them before sending."""
+    if count is None:
+        count = default_question_count()
+    if count <= 0:
+        # Whole subject, served from the question cache
+        questions = qdao.get_by_subject(subject_id)
+        if seed is not None:
+            random.Random(seed).shuffle(questions)
+        return questions
+    index = qdao.get_answer_rows(subject_id)
+    return qdao.get_by_ids(sample_question_ids(index, count, seed, stratify))
@@ -1,46 +1,173 @@
 # src/services/student_service.py
+from datetime import datetime, timezone
 from dao.question_dao import QuestionDAO
 from dao.attempt_dao import AttemptDAO
-from dao.supabase_client import client
+from dao.subject_dao import SubjectDAO
+from dao.stats_dao import StatsDAO
+from services.leaderboard_service import LeaderboardService
+from services.grading import AnswerKey
+from services.sampling import generate_quiz, quiz_question_ids
+from services.attempt_queue import get_attempt_queue, queue_enabled
+from models.attempt import Attempt
+from dao.cache import TTLCache
+from dao.config import get_int_setting
+
+# subject_id -> (answer rows it was built from, AnswerKey); rebuilt whenever
+# QuestionDAO reloads the subject's answer rows
+_answer_keys = None
+# (user_id, subject_id) -> question ids of the quiz last issued to that student.
+# Submissions are graded against these, never against ids sent back by the client.
+_issued_quizzes = None
+
+
+class QuizNotIssued(Exception):
+    """No open quiz to grade: never started, already submitted, or expired (QUIZ_SESSION_TTL, restart)."""
+
+def _keys():
+    global _answer_keys
+    if _answer_keys is None:
+        _answer_keys = TTLCache(
+            maxsize=get_int_setting("QUESTION_CACHE_MAXSIZE", 256),
+            ttl=get_int_setting("QUESTION_CACHE_TTL", 300),
+        )
+    return _answer_keys
+
+def _issued():
+    global _issued_quizzes
+    if _issued_quizzes is None:
+        _issued_quizzes = TTLCache(
+            maxsize=get_int_setting("QUIZ_SESSION_MAXSIZE", 10000),
+            ttl=get_int_setting("QUIZ_SESSION_TTL", 3 * 60 * 60),
+        )
+    return _issued_quizzes
 
 class StudentService:
     def __init__(self):
         self.qdao = QuestionDAO()
         self.adao = AttemptDAO()
+        self.sdao = SubjectDAO()
+        self.stats = StatsDAO()
+        self.leaderboard = LeaderboardService()
+        if queue_enabled():
+            # Started eagerly so attempts spooled before a restart are delivered
+            get_attempt_queue(self._record_saved)
 
     def list_subjects(self):
-        try:
-            res = client.table("subjects").select("*").execute()
-            print(f"✅ Found {len(res.data)} subjects")
-            return res.data or []
-        except Exception as e:
-            print(f"❌ Error listing subjects: {e}")
-            return []
+        return self.sdao.get_all()
 
-    def start_quiz(self, user, subject_id):
+    def get_subject(self, subject_id):
+        return self.sdao.get_by_id(subject_id)
+
+    def start_quiz(self, user, subject_id, count=None, seed=None, stratify=False):
         try:
-            questions = self.qdao.get_by_subject(subject_id)
+            questions = generate_quiz(self.qdao, subject_id, count, seed, stratify)
             if not questions:
                 return False, "No questions available for this subject"
             
-            return True, questions
+            # Answers stay on the server; submissions are graded by submit_answers
+            _issued().set((user['user_id'], subject_id), tuple(q.question_id for q in questions))
+            return True, [q.without_answer() for q in questions]
+        except Exception as e:
+            print(f"❌ Error starting quiz: {e}")
+            return False, f"Error starting quiz: {str(e)}"
+
+    def plan_quiz(self, user, subject_id, count=None, seed=None, stratify=False):
+        # Paged quizzes start from the question ids alone; rows are loaded a page at a time
+        try:
+            question_ids = quiz_question_ids(self.qdao, subject_id, count, seed, stratify)
+            if not question_ids:
+                return False, "No questions available for this subject"
+            _issued().set((user['user_id'], subject_id), tuple(question_ids))
+            return True, question_ids
         except Exception as e:
             print(f"❌ Error starting quiz: {e}")
             return False, f"Error starting quiz: {str(e)}"
 
-    def submit_attempt(self, user_id, subject_id, total_questions, correct_answers):
+    def get_quiz_questions(self, question_ids):
+        return [q.without_answer() for q in self.qdao.get_by_ids(question_ids)]
+
+    def get_answer_key(self, subject_id):
+        rows = self.qdao.get_answer_rows(subject_id)
+        entry = _keys().get(subject_id)
+        if entry is None or entry[0] is not rows:
+            entry = (rows, AnswerKey.from_questions(rows))
+            _keys().set(subject_id, entry)
+        return entry[1]
+
+    def submit_answers(self, user_id, subject_id, answers, question_ids=None):
+        """Grade chosen options ({question_id: 'A'..'D'}) and record the attempt.
+
+        Grading uses the questions start_quiz/plan_quiz issued to this student;
+        ``question_ids`` (what the client believes it was asked) and the answered
+        ids must come from that set. Each issued quiz can be submitted once.
+        Returns (attempt, GradeResult); attempt is None if saving failed, and
+        both are None if the submission was rejected or could not be graded.
+        Raises QuizNotIssued when there is no open quiz; retrying cannot help,
+        the student has to start the quiz again.
+        """
+        issued = _issued().get((user_id, subject_id))
+        if issued is None:
+            raise QuizNotIssued(f"No open quiz for user {user_id} in subject {subject_id}")
+        try:
+            allowed = set(issued)
+            unknown = (set(question_ids or ()) | set(answers)) - allowed
+            if unknown:
+                print(f"❌ Rejected submission with questions that were not issued: {sorted(unknown)[:10]}")
+                return None, None
+            _issued().invalidate((user_id, subject_id))
+            
+            key = self.get_answer_key(subject_id)
+            # Questions deleted since the quiz was issued cannot be graded
+            key = key.subset(qid for qid in issued if qid in key)
+            if not len(key):
+                print(f"❌ Every question of user {user_id}'s quiz in subject {subject_id} was deleted")
+                return None, None
+            result = key.grade(answers)
+        except Exception as e:
+            print(f"❌ Error grading answers: {e}")
+            return None, None
+        
+        attempt = self.submit_attempt(user_id, subject_id, result.total, result.correct_count,
+                                      answers=result.answer_rows(key))
+        return attempt, result
+
+    def submit_attempt(self, user_id, subject_id, total_questions, correct_answers, answers=None):
+        # ``answers``: optional per-question rows ({question_id, chosen_option, is_correct})
         try:
             score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
             
-            attempt = self.adao.create_attempt(
-                user_id=user_id,
-                subject_id=subject_id,
-                total_questions=total_questions,
-                correct_answers=correct_answers,
-                score=score
-            )
+            row = {
+                "user_id": user_id,
+                "subject_id": subject_id,
+                "total_questions": total_questions,
+                "correct_answers": correct_answers,
+                "score": score,
+            }
+            if queue_enabled():
+                # Acknowledged once spooled locally; the queue worker inserts it
+                # and then updates the leaderboard and stats via _record_saved
+                row["started_at"] = datetime.now(timezone.utc).isoformat()
+                get_attempt_queue(self._record_saved).enqueue({**row, "answers": answers or []})
+                return Attempt.from_row(row)
+            
+            # The attempt and its answers are stored together or not at all
+            saved = self.adao.record_attempts([{**row, "answers": answers or []}])
+            attempt = saved[0] if saved else None
+            
+            if attempt:
+                self._record_saved(attempt)
             
             return attempt
         except Exception as e:
             print(f"❌ Error submitting attempt: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def _record_saved(self, attempt):
+        try:
+            self.leaderboard.record_attempt(attempt)
+        except Exception as e:
+            print(f"❌ Error updating leaderboard: {e}")
+        try:
+            self.stats.record_attempt(attempt['user_id'], attempt['subject_id'], attempt['score'], attempt.get('started_at'))
+        except Exception as e:
+            print(f"❌ Error updating student stats: {e}")